@@ -0,0 +1,6 @@
+from src.app import create_app
+from src.serving.asgi import AsgiAdapter
+from src.serving.buffer import GameBuffer
+from src.serving.pool import SolverPool
+
+application = AsgiAdapter.from_env(create_app(SolverPool.from_env(), GameBuffer.from_env()))
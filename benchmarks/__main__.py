@@ -0,0 +1,76 @@
+import argparse
+import datetime
+import json
+import platform
+import sys
+from typing import Any
+
+from . import games, routes, solver
+
+
+def _compare(
+        results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float,
+) -> list[tuple[str, float, float]]:
+    baseline_means = {result["name"]: result["mean"] for result in baseline}
+    return [
+        (result["name"], baseline_means[result["name"]], result["mean"])
+        for result in results
+        if result["name"] in baseline_means
+        and result["mean"] > baseline_means[result["name"]] * (1 + threshold)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the solver, game generation and route benchmarks.")
+    parser.add_argument("--groups", nargs="+", choices=["solver", "games", "routes"],
+                        default=["solver", "games", "routes"])
+    parser.add_argument("--max-hands", type=int, default=50, help="hands sampled per quantity, 0 for all of them")
+    parser.add_argument("--games", type=int, default=1000, help="games generated per option preset")
+    parser.add_argument("--requests", type=int, default=200, help="requests sent per route")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", default="benchmarks/baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging a regression")
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+    if "solver" in args.groups:
+        results += solver.run(args.max_hands)
+    if "games" in args.groups:
+        results += games.run(args.games)
+    if "routes" in args.groups:
+        results += routes.run(args.requests)
+
+    for result in results:
+        print(f"{result['name']:<70} mean {result['mean'] * 1e6:>12.1f}us  "
+              f"p50 {result['p50'] * 1e6:>12.1f}us  p99 {result['p99'] * 1e6:>12.1f}us")
+
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "arguments": vars(args),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as fd:
+            json.dump(report, fd, indent=2)
+        return 0
+
+    try:
+        with open(args.baseline) as fd:
+            baseline = json.load(fd)["results"]
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 1
+    regressions = _compare(results, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before * 1e6:.1f}us -> {after * 1e6:.1f}us")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
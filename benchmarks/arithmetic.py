@@ -0,0 +1,33 @@
+import time
+
+from src.solver.algorithm import find_solution_for_target
+from src.solver.arithmetic import Arithmetic
+from src.utils.game_options import GameOptions
+from src.utils.hands import all_hands
+
+
+def _run(hands: list[tuple[int, ...]], target: int, options: GameOptions, arithmetic: Arithmetic) -> tuple[int, float]:
+    start_time = time.perf_counter()
+    solved = sum(
+        find_solution_for_target(list(hand), target, options, arithmetic) is not None
+        for hand in hands
+    )
+    return solved, time.perf_counter() - start_time
+
+
+def main() -> None:
+    hands = all_hands(4)
+    target = 24
+    print(f"{len(hands)} four-number hands, target {target}")
+    for name, options in (
+            ("integer", GameOptions.from_integer_solvable()),
+            ("float", GameOptions.from_float_only()),
+    ):
+        for arithmetic in Arithmetic:
+            solved, elapsed = _run(hands, target, options, arithmetic)
+            print(f"{name:>8} {arithmetic.value:>6}: {solved:4d} solved in {elapsed:.3f}s "
+                  f"({elapsed / len(hands) * 1e6:.0f}us per hand)")
+
+
+if __name__ == "__main__":
+    main()
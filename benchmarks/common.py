@@ -0,0 +1,49 @@
+import statistics
+import time
+from typing import Any, Callable
+
+from src.utils.game_options import GameOptions
+from src.utils.hands import all_hands
+
+
+__all__ = ["OPTION_PRESETS", "TARGETS", "measure", "sample_hands", "summarize"]
+
+
+OPTION_PRESETS = {
+    "integer": GameOptions.from_integer_solvable(),
+    "float_only": GameOptions.from_float_only(),
+    "solvable": GameOptions.from_solvable(),
+    "integer_partial": GameOptions(must_use_all=False),
+}
+
+TARGETS = {4: 24, 5: 48, 6: 24}
+
+
+def sample_hands(quantity: int, max_hands: int) -> list[tuple[int, ...]]:
+    hands = all_hands(quantity)
+    if max_hands <= 0 or len(hands) <= max_hands:
+        return hands
+    step = len(hands) / max_hands
+    return [hands[int(i * step)] for i in range(max_hands)]
+
+
+def measure(fn: Callable[[Any], Any], inputs: list[Any]) -> list[float]:
+    samples = []
+    for item in inputs:
+        start_time = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start_time)
+    return samples
+
+
+def summarize(name: str, samples: list[float], **extra: Any) -> dict[str, Any]:
+    ordered = sorted(samples)
+    return {
+        "name": name,
+        "count": len(samples),
+        "total": sum(samples),
+        "mean": statistics.fmean(samples),
+        "p50": ordered[len(ordered) // 2],
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        **extra,
+    }
@@ -0,0 +1,32 @@
+import time
+
+from src.solver.solver import SolverEngine, find_one_solution
+from src.utils.game_options import GameOptions
+from src.utils.hands import all_hands
+
+
+def _run(hands: list[tuple[int, ...]], target: int, options: GameOptions, engine: SolverEngine) -> tuple[int, float]:
+    start_time = time.perf_counter()
+    solved = sum(
+        find_one_solution(list(hand), target, options, engine) is not None
+        for hand in hands
+    )
+    return solved, time.perf_counter() - start_time
+
+
+def main() -> None:
+    for quantity, target in ((4, 24), (5, 48)):
+        hands = all_hands(quantity)
+        print(f"{len(hands)} {quantity}-number hands, target {target}")
+        for name, options in (
+                ("integer", GameOptions.from_integer_solvable()),
+                ("float", GameOptions.from_float_only()),
+        ):
+            for engine in SolverEngine:
+                solved, elapsed = _run(hands, target, options, engine)
+                print(f"{name:>8} {engine.value:>8}: {solved:5d} solved in {elapsed:.3f}s "
+                      f"({elapsed / len(hands) * 1e6:.0f}us per hand)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+from typing import Any
+
+from src.game import create_game
+
+from .common import OPTION_PRESETS, TARGETS, measure, summarize
+
+
+def run(games: int) -> list[dict[str, Any]]:
+    results = []
+    for quantity in (4, 5):
+        target = TARGETS[quantity]
+        for preset, options in OPTION_PRESETS.items():
+            create_game(quantity, target, options, seed=0)
+            samples = measure(lambda seed: create_game(quantity, target, options, seed), list(range(games)))
+            results.append(summarize(f"games.create.{quantity}.{preset}", samples))
+    return results
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import time
+from typing import Any
+from unittest import mock
+
+from .common import summarize
+
+
+_ROUTES = [
+    "/api/classic/24",
+    "/api/classic/24?allow_integer=false&allow_float_only=true",
+    "/api/classic/48",
+    "/api/today",
+    "/api/query/classic/24/1/3/4/6",
+    "/api/query/classic/48/1/2/3/4/5",
+    "/api/stats",
+]
+
+
+def run(requests: int) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as log_dir, mock.patch.dict(os.environ, TRACKER_LOG_DIR=log_dir):
+        from src.app import create_app
+
+        client = create_app().test_client()
+        results = []
+        for route in _ROUTES:
+            client.get(route)
+            samples = []
+            for _ in range(requests):
+                start_time = time.perf_counter()
+                response = client.get(route)
+                samples.append(time.perf_counter() - start_time)
+                assert response.status_code == 200, (route, response.status_code)
+            results.append(summarize(f"routes.{route}", samples, requests_per_second=len(samples) / sum(samples)))
+        return results
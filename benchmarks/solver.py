@@ -0,0 +1,37 @@
+from typing import Any, Callable
+
+from src.solver import bitmask
+from src.solver.memo import get_reachable_memo
+from src.solver.solver import find_one_solution
+from src.utils.game_options import GameOptions
+
+from .common import OPTION_PRESETS, TARGETS, measure, sample_hands, summarize
+
+
+def run(max_hands: int) -> list[dict[str, Any]]:
+    results = []
+    for quantity, target in TARGETS.items():
+        hands = sample_hands(quantity, max_hands)
+        for preset, options in OPTION_PRESETS.items():
+            # the bitmask engine on its own, then whichever engine the solver picks for this hand size
+            for engine, find_solution in (
+                    ("bitmask", bitmask.find_solution_for_target),
+                    ("picked", find_one_solution),
+            ):
+                solved = 0
+
+                def find(
+                        hand: tuple[int, ...], options: GameOptions = options,
+                        find_solution: Callable[..., Any] = find_solution,
+                ) -> None:
+                    nonlocal solved
+                    solved += find_solution(list(hand), target, options) is not None
+
+                get_reachable_memo().clear()
+                samples = measure(find, hands)
+                results.append(summarize(f"solver.find.{engine}.{quantity}.{preset}", samples, solved=solved))
+
+            get_reachable_memo().clear()
+            samples = measure(lambda hand: bitmask.all_results(list(hand), options), hands)
+            results.append(summarize(f"solver.all_results.{quantity}.{preset}", samples))
+    return results
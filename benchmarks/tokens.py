@@ -0,0 +1,36 @@
+import time
+from base64 import urlsafe_b64encode
+
+from src.index.solvability import get_solvability_index
+from src.utils.cipher import encode_solution, get_encryptor_decryptor
+from src.utils.game_options import GameOptions
+from src.utils.hands import all_hands
+
+
+def _per_call(fn, items: list) -> float:
+    start_time = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start_time) / len(items)
+
+
+def main() -> None:
+    index = get_solvability_index(4, 24, must_use_all=True)
+    solutions = [
+        solution
+        for hand in all_hands(4)
+        if (solution := index.lookup(hand)[1]) is not None
+    ]
+    encrypt, decrypt = get_encryptor_decryptor("benchmark", ("previous",))
+    signed = [encrypt(solution) for solution in solutions]
+    legacy = [urlsafe_b64encode(solution.to_string().encode("utf-8")) for solution in solutions]
+    print(f"{len(solutions)} solutions for 4-number hands, target 24, with {GameOptions()}")
+    print(f"  signed token length: {sum(map(len, signed)) / len(signed):.1f} chars "
+          f"(unsigned {sum(len(encode_solution(solution)) for solution in solutions) / len(solutions):.1f}, "
+          f"text {sum(map(len, legacy)) / len(legacy):.1f})")
+    print(f"  encode: {_per_call(encrypt, solutions) * 1e6:.2f}us per token")
+    print(f"  decode: {_per_call(decrypt, signed) * 1e6:.2f}us per token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import time
+from typing import Callable
+
+from src.solver import bitmask, vectorised
+from src.utils.expression import Expression
+from src.utils.game_options import GameOptions
+
+from .common import sample_hands
+
+
+def _run(
+        hands: list[tuple[int, ...]], options: GameOptions,
+        fn: Callable[[list[int], GameOptions], dict[int, Expression] | vectorised.ReachableValues],
+) -> tuple[int, float]:
+    start_time = time.perf_counter()
+    reachable = sum(len(fn(list(hand), options)) for hand in hands)
+    return reachable, time.perf_counter() - start_time
+
+
+def main() -> None:
+    for quantity, max_hands in ((4, 200), (5, 50), (6, 5)):
+        hands = sample_hands(quantity, max_hands)
+        print(f"{len(hands)} {quantity}-number hands")
+        for name, options in (
+                ("integer", GameOptions.from_integer_solvable()),
+                ("float", GameOptions.from_float_only()),
+        ):
+            for engine, fn in (
+                    ("bitmask", bitmask.all_results),
+                    ("numpy", vectorised.reachable_values),
+            ):
+                reachable, elapsed = _run(hands, options, fn)
+                print(f"{name:>8} {engine:>8}: {reachable:8d} values in {elapsed:.3f}s "
+                      f"({elapsed / len(hands) * 1e3:.1f}ms per hand)")
+
+
+if __name__ == "__main__":
+    main()
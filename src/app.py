@@ -1,20 +1,39 @@
 from __future__ import annotations
 
-import datetime
+import itertools
+import json
+import math
 import os
+import secrets
+import time
 from dataclasses import dataclass
+from datetime import date
+from functools import partial
+from typing import Any, Callable
 
 import flask as flk
 
 from .models import GameModel
 
-from .game import check_game, create_game
-from .tracker.options import TrackerOptions
+from .game import GameStats, check_classic_game, create_game
+from .index.solvability import MAX_INDEXED_QUANTITY, MissingIndexError, NoSolvableHandError, get_solvability_index
+from .metrics import COUNT_BUCKETS, Metrics
+from .serving.admission import AdmissionControl, RateLimitedError, client_ip, estimate_cost
+from .serving.batch import BatchItem, BatchResult, solve_batch
+from .serving.bulk import BulkRequest, generate_games, pack_game, pack_header
+from .serving.buffer import GameBuffer
+from .serving.calendar import GameCalendar, seconds_until_midnight, utc_today
+from .serving.pool import SolverBusyError, SolverPool
+from .solver.cache import SolutionCache
+from .solver.memo import get_reachable_memo
+from .solver.solver import find_integer_and_float_solutions
+from .solver.stats import SolverStats, collect_stats
+from .tracker.options import LogFormat, TrackerOptions
 from .tracker.tracker import Tracker
 from .utils.cipher import get_encryptor_decryptor
 from .utils.expression import Expression
-from .utils.game_options import GameOptions
-from .utils.parse import parse_int, parse_to_bool_dict
+from .utils.game_options import Difficulty, GameOptions
+from .utils.parse import parse_bool, parse_int, parse_to_bool_dict
 
 
 __all__ = ["create_app"]
@@ -24,21 +43,64 @@ __all__ = ["create_app"]
 class _Route:
     classic_24 = "/api/classic/24"
     classic_48 = "/api/classic/48"
+    classic = "/api/classic/<int:quantity>/<int:target>"
     query_classic = "/api/query/classic/<int:target>/<path:numbers_in_path>"
+    query_batch = "/api/query/batch"
+    bulk_games = "/api/games/bulk"
     game_of_the_day = "/api/today"
     solution = "/api/solution/<encoded_solution>"
+    stats = "/api/stats"
+    metrics = "/api/metrics"
 
 
 class _App:
     ROUTES = _Route()
+    # an unsolvable 7-number hand takes ~17s cold, past the default SOLVER_TIMEOUT
+    MAX_QUANTITY = 6
 
-    def __init__(self, app: flk.Flask):
+    def __init__(
+            self,
+            app: flk.Flask,
+            solver_pool: SolverPool | None = None,
+            game_buffer: GameBuffer | None = None,
+    ):
         self.app = app
-        self.tracker = Tracker(TrackerOptions())
+        self.solver_pool = solver_pool
+        self.game_buffer = game_buffer
+        self.tracker = Tracker(TrackerOptions(
+            log_dir=os.environ.get("TRACKER_LOG_DIR") or "logs",
+            log_format=LogFormat(os.environ.get("TRACKER_LOG_FORMAT") or LogFormat.TEXT.value),
+        ))
 
-        self.SALT_TODAY = os.environ.get("SALT_TODAY", "09sdfjgn1o3iua0s9dfij12k34j")
+        self.calendar = GameCalendar.from_env()
 
-        self.encrypt, self.decrypt = get_encryptor_decryptor()
+        # without a configured secret, links only stay valid within this process
+        self.encrypt, self.decrypt = get_encryptor_decryptor(
+            os.environ.get("SOLUTION_SECRET") or secrets.token_hex(32),
+            tuple(filter(None, (os.environ.get("SOLUTION_PREVIOUS_SECRETS") or "").split(","))),
+            date.fromisoformat(until) if (until := os.environ.get("SOLUTION_ALLOW_UNSIGNED_UNTIL")) else None,
+        )
+
+        self.solution_cache = SolutionCache(
+            max_size=int(os.environ.get("SOLUTION_CACHE_SIZE") or 4096),
+            ttl=float(ttl) if (ttl := os.environ.get("SOLUTION_CACHE_TTL")) else None,
+            shared_path=os.environ.get("SOLUTION_CACHE_PATH") or None,
+        )
+
+        self.batch_max_items = int(os.environ.get("BATCH_MAX_ITEMS") or 1000)
+        self.bulk_max_games = int(os.environ.get("BULK_MAX_GAMES") or 10000)
+
+        self.admission = AdmissionControl.from_env()
+        self.trusted_proxies = int(os.environ.get("TRUSTED_PROXIES") or 0)
+
+        self.metrics = Metrics()
+        self.solver_metrics = parse_bool(os.environ.get("SOLVER_METRICS") or "false") or False
+
+        get_solvability_index(4, 24, must_use_all=True)
+        get_solvability_index(5, 48, must_use_all=True)
+        self.calendar.prefill()
+        if self.game_buffer is not None:
+            self.game_buffer.prime([(4, 24, GameOptions()), (5, 48, GameOptions())])
 
         @app.route("/favicon.ico", methods=["GET"])
         def favicon():
@@ -53,15 +115,37 @@ class _App:
         def quick_classic_48_game():
             return self.create_game(flk.request, 5, 48)
 
+        @app.route(self.ROUTES.classic, methods=["GET", "POST"])
+        def classic_game(quantity: int, target: int):
+            if not 1 <= quantity <= self.MAX_QUANTITY:
+                return {
+                    "error": f"quantity must be between 1 and {self.MAX_QUANTITY}",
+                }, 400
+            return self.create_game(flk.request, quantity, target, route="classic", prebuilt_only=True)
+
         @app.route(self.ROUTES.game_of_the_day, methods=["GET", "POST"])
         def game_of_the_day():
-            seed = datetime.date.today().isoformat() + self.SALT_TODAY
-            options = GameOptions.from_solvable()
-            numbers, solution, time_taken = create_game(4, 24, options, seed)
-            return {
+            debug = self.is_debug(flk.request)
+            start_time = time.time()
+            today = utc_today()
+            numbers, solution = self.calendar.get(today)
+            wall_time = time.time() - start_time
+            self.record_metrics("today", numbers, self.calendar.OPTIONS, wall_time, None)
+            response = {
                 "numbers": numbers,
-                "time_taken": time_taken,
+                "time_taken": wall_time,
             }
+            if debug:
+                response["debug"] = {
+                    "wall_time": wall_time,
+                    "calendar": self.calendar.stats(),
+                }
+                return response
+            response = flk.make_response(response)
+            response.set_etag(self.calendar.etag(today, (numbers, solution)))
+            response.cache_control.public = True
+            response.cache_control.max_age = seconds_until_midnight()
+            return response.make_conditional(flk.request)
 
         @app.route(self.ROUTES.query_classic, methods=["GET", "POST"])
         def query_classic_game(target: int, numbers_in_path: str):
@@ -70,23 +154,102 @@ class _App:
                 for number_str in numbers_in_path.split("/")
                 if (number := parse_int(number_str)) is not None
             ]
-            int_solution, int_time_taken = check_game(numbers, target, GameOptions.from_integer_solvable())
-            float_solution, float_time_taken = check_game(numbers, target, GameOptions.from_float_only())
+            if not 1 <= len(numbers) <= self.MAX_QUANTITY:
+                return {
+                    "error": f"Between 1 and {self.MAX_QUANTITY} numbers are allowed",
+                }, 400
+            options = GameOptions()
+            debug = self.is_debug(flk.request)
+            stats = SolverStats() if debug or self.solver_metrics else None
+            start_time = time.time()
+            cost = estimate_cost(len(numbers), GameOptions.from_solvable())
+            with self.admission.admit(self.client(flk.request), cost):
+                int_solution, float_solution, time_taken = check_classic_game(
+                    numbers, target, self.solution_cache, partial(self.run_solver, find_integer_and_float_solutions),
+                    stats,
+                )
+            wall_time = time.time() - start_time
+            self.record_metrics("query_classic", numbers, options, wall_time, stats)
             integer_feasible = int_solution is not None
-            return {
+            response = {
                 "numbers": numbers,
                 "target": target,
                 "integer_feasible": integer_feasible,
                 "solution": self.get_solution_link(flk.request, int_solution if integer_feasible else float_solution),
-                "time_taken": int_time_taken + float_time_taken,
+                "time_taken": time_taken,
             }
+            if debug:
+                response["debug"] = self.debug_info(stats, wall_time)
+            return response
+
+        @app.route(self.ROUTES.query_batch, methods=["POST"])
+        def query_batch():
+            return self.query_batch(flk.request)
+
+        @app.route(self.ROUTES.bulk_games, methods=["POST"])
+        def bulk_games():
+            return self.bulk_games(flk.request)
 
         @app.route(self.ROUTES.solution, methods=["GET", "POST"])
         def decode(encoded_solution: str):
+            try:
+                solution = self.decrypt(encoded_solution)
+            except ValueError:
+                return {
+                    "error": "Invalid solution link",
+                }, 400
             return {
-                "solution": self.decrypt(encoded_solution),
+                "solution": solution,
             }
 
+        @app.route(self.ROUTES.stats, methods=["GET"])
+        def stats():
+            return {
+                "tracker": self.tracker.stats(),
+                "solution_cache": self.solution_cache.stats(),
+                "solver_pool": self.solver_pool.stats() if self.solver_pool is not None else None,
+                "game_buffer": self.game_buffer.stats() if self.game_buffer is not None else None,
+                "calendar": self.calendar.stats(),
+                "reachable_memo": (
+                    get_reachable_memo().stats() if self.solver_pool is None else self.solver_pool.memo_stats()
+                ),
+                "admission": self.admission.stats(),
+            }
+
+        @app.route(self.ROUTES.metrics, methods=["GET"])
+        def metrics():
+            return self.metrics.to_dict()
+
+        @app.errorhandler(RateLimitedError)
+        def rate_limited(error):
+            return {
+                "error": "Too many requests, try again later",
+            }, 429, {"Retry-After": str(max(math.ceil(error.retry_after), 1))}
+
+        @app.errorhandler(SolverBusyError)
+        def solver_busy(error):
+            return {
+                "error": "Solver is busy, try again later",
+            }, 503, {"Retry-After": "1"}
+
+        @app.errorhandler(NoSolvableHandError)
+        def no_solvable_hand(error):
+            return {
+                "error": str(error),
+            }, 404
+
+        @app.errorhandler(MissingIndexError)
+        def missing_index(error):
+            return {
+                "error": str(error),
+            }, 404
+
+        @app.errorhandler(TimeoutError)
+        def solver_timeout(error):
+            return {
+                "error": "Solver timed out",
+            }, 504
+
         @app.errorhandler(404)
         def page_not_found(error):
             url = flk.request.url
@@ -95,46 +258,247 @@ class _App:
                 "help": {
                     url + self.ROUTES.classic_24: "Get a classic 24 game",
                     url + self.ROUTES.classic_48: "Get a classic 48 game",
+                    url + self.ROUTES.classic: "Get a game for any quantity and target",
                     url + self.ROUTES.game_of_the_day: "Get a game of the day",
                     url + self.ROUTES.query_classic: "Query a classic game",
+                    url + self.ROUTES.query_batch: "Query many games at once",
+                    url + self.ROUTES.bulk_games: "Generate many reproducible games at once",
                 },
             }, 404
 
-    def create_game(self, request: flk.Request, quantity: int, target: int) -> dict | tuple[dict, int]:
+    def create_game(
+            self, request: flk.Request, quantity: int, target: int,
+            route: str | None = None, prebuilt_only: bool = False,
+    ) -> dict | tuple[dict, int]:
         options = GameOptions.parse_from_dict(parse_to_bool_dict(request.values))
+        if (difficulty := request.values.get("difficulty")) is not None:
+            if difficulty not in {level.value for level in Difficulty}:
+                return {
+                    "error": f"difficulty must be one of {', '.join(level.value for level in Difficulty)}",
+                }, 400
+            options = options.with_difficulty(Difficulty(difficulty))
         options_valid, error = options.is_valid()
         if not options_valid:
             return {
                 "error": error,
             }, 400
+        if options.difficulty is not None and quantity > MAX_INDEXED_QUANTITY:
+            return {
+                "error": f"difficulty is only available for up to {MAX_INDEXED_QUANTITY} numbers",
+            }, 400
 
-        numbers, solution, time_taken = create_game(quantity, target, options)
+        debug = self.is_debug(request)
+        stats = GameStats() if debug or self.solver_metrics else None
+        start_time = time.time()
+        buffered = False
+        # the buffer refills any key it is asked for, so only the fixed routes use it
+        if (
+                self.game_buffer is not None and not prebuilt_only
+                and (game := self.game_buffer.pop(quantity, target, options)) is not None
+        ):
+            numbers, solution = game
+            time_taken = time.time() - start_time
+            buffered = True
+        else:
+            with self.admission.admit(self.client(request), estimate_cost(quantity, options)):
+                numbers, solution, time_taken = self.run_solver(
+                    create_game, quantity, target, options, None, self.solver_timeout, prebuilt_only, stats=stats,
+                )
+        wall_time = time.time() - start_time
+        self.record_metrics(route or f"classic_{target}", numbers, options, wall_time, None if buffered else stats)
         game = GameModel(
             game_options=options,
             numbers=numbers,
             solution=solution,
             target=target,
         )
-        self.tracker.record(game, time_taken, request)
-        return {
+        self.tracker.record(game, time_taken, self.client(request))
+        response = {
             "numbers": numbers,
             "target": target,
             "solution": self.get_solution_link(request, solution),
             "time_taken": time_taken,
             "options": options.to_dict(),
         }
+        if debug:
+            response["debug"] = self.debug_info(stats, wall_time, buffered=buffered)
+        return response
+
+    def query_batch(self, request: flk.Request) -> flk.Response | tuple[dict, int]:
+        body = request.get_json(silent=True)
+        raw_items = body.get("items") if isinstance(body, dict) else body
+        if not isinstance(raw_items, list):
+            return {
+                "error": "Expected a JSON list of items or an object with an items list",
+            }, 400
+        if len(raw_items) > self.batch_max_items:
+            return {
+                "error": f"At most {self.batch_max_items} items are allowed in one batch",
+            }, 400
+
+        items: list[BatchItem] = []
+        positions: list[int] = []
+        errors: list[dict[str, Any]] = []
+        for index, raw_item in enumerate(raw_items):
+            try:
+                items.append(BatchItem.parse(raw_item, self.MAX_QUANTITY))
+                positions.append(index)
+            except ValueError as error:
+                errors.append({"index": index, "error": str(error)})
+
+        def lines(result: BatchResult) -> list[str]:
+            return [
+                json.dumps({
+                    "index": positions[index],
+                    "numbers": items[index].numbers,
+                    "target": items[index].target,
+                    "options": items[index].options.to_dict(),
+                    **(
+                        {"error": result.error}
+                        if result.error is not None
+                        else {
+                            "solution": self.get_solution_link(request, result.solution),
+                            "time_taken": result.time_taken,
+                            "cached": result.cached,
+                        }
+                    ),
+                }) + "\n"
+                for index in result.indices
+            ]
+
+        cost = sum(estimate_cost(len(item.numbers), item.options) for item in items)
+        self.admission.acquire(self.client(request), cost)
+
+        def generate():
+            start_time = time.time()
+            for error in errors:
+                yield json.dumps(error) + "\n"
+            for result in solve_batch(items, self.solution_cache, self.solver_pool):
+                yield "".join(lines(result))
+            self.metrics.observe("query_batch.time_taken", time.time() - start_time)
+            self.metrics.observe("query_batch.items", len(raw_items), COUNT_BUCKETS)
+
+        response = flk.Response(flk.stream_with_context(generate()), mimetype="application/x-ndjson")
+        response.call_on_close(partial(self.admission.release, cost))
+        return response
+
+    def bulk_games(self, request: flk.Request) -> flk.Response | tuple[dict, int]:
+        body = request.get_json(silent=True)
+        try:
+            bulk = BulkRequest.parse(body, self.bulk_max_games, self.MAX_QUANTITY)
+        except ValueError as error:
+            return {
+                "error": str(error),
+            }, 400
+        binary = isinstance(body, dict) and body.get("format") == "binary"
+        cost = bulk.count * estimate_cost(bulk.quantity, bulk.options)
+        self.admission.acquire(self.client(request), cost)
+        start_time = time.time()
+        games = generate_games(bulk.seed, bulk.count, bulk.quantity, bulk.target, bulk.options, self.solver_pool)
+        try:
+            # errors such as an unreachable target surface before the response starts
+            first_game = next(games)
+        except BaseException:
+            self.admission.release(cost)
+            raise
+
+        def generate():
+            if binary:
+                yield pack_header(bulk.quantity, bulk.target, bulk.options, bulk.count)
+            for index, (numbers, solution) in enumerate(itertools.chain([first_game], games)):
+                if binary:
+                    yield pack_game(numbers, solution)
+                else:
+                    yield json.dumps({
+                        "index": index,
+                        "numbers": numbers,
+                        "solution": self.get_solution_link(request, solution),
+                    }) + "\n"
+            elapsed = time.time() - start_time
+            self.metrics.observe("bulk_games.time_taken", elapsed)
+            self.metrics.observe("bulk_games.games_per_second", bulk.count / elapsed if elapsed else 0.0, COUNT_BUCKETS)
+            if not binary:
+                yield json.dumps({
+                    "count": bulk.count,
+                    "time_taken": elapsed,
+                    "games_per_second": bulk.count / elapsed if elapsed else None,
+                }) + "\n"
+
+        response = flk.Response(
+            flk.stream_with_context(generate()),
+            mimetype="application/octet-stream" if binary else "application/x-ndjson",
+        )
+        response.call_on_close(partial(self.admission.release, cost))
+        return response
+
+    @property
+    def solver_timeout(self) -> float | None:
+        return self.solver_pool.timeout if self.solver_pool is not None else None
+
+    def run_solver(self, fn: Callable[..., Any], *args: Any, stats: SolverStats | GameStats | None = None) -> Any:
+        if stats is None:
+            if self.solver_pool is None:
+                return fn(*args)
+            return self.solver_pool.run(fn, *args)
+        if self.solver_pool is None:
+            result, _ = collect_stats(fn, stats, *args)
+            return result
+        result, worker_stats = self.solver_pool.run(collect_stats, fn, type(stats)(), *args)
+        stats.merge(worker_stats)
+        return result
+
+    def client(self, request: flk.Request) -> str | None:
+        return client_ip(request, self.trusted_proxies)
+
+    @staticmethod
+    def is_debug(request: flk.Request) -> bool:
+        return parse_to_bool_dict(request.values).get("debug", False)
+
+    @staticmethod
+    def debug_info(stats: SolverStats | GameStats | None, wall_time: float, **extra: Any) -> dict[str, Any]:
+        return {
+            **extra,
+            "wall_time": wall_time,
+            "solver_time": stats.elapsed,
+            "overhead_time": max(wall_time - stats.elapsed, 0.0),
+            "stats": stats.to_dict(),
+        }
+
+    def record_metrics(
+            self, route: str, numbers: list[int], options: GameOptions,
+            wall_time: float, stats: SolverStats | GameStats | None,
+    ) -> None:
+        self.metrics.observe(f"{route}.time_taken", wall_time)
+        self.metrics.observe_slowest(wall_time, route=route, numbers=numbers, options=options.to_dict())
+        if stats is None:
+            return
+        solver_stats = stats.solver if isinstance(stats, GameStats) else stats
+        if isinstance(stats, GameStats):
+            self.metrics.observe(f"{route}.hands_rejected", stats.hands_rejected, COUNT_BUCKETS)
+        self.metrics.observe(f"{route}.solver_time", stats.elapsed)
+        self.metrics.observe(f"{route}.subsets_visited", solver_stats.subsets_visited, COUNT_BUCKETS)
+        self.metrics.observe(f"{route}.value_pairs_combined", solver_stats.value_pairs_combined, COUNT_BUCKETS)
+        self.metrics.observe(f"{route}.value_pairs_pruned", solver_stats.value_pairs_pruned, COUNT_BUCKETS)
+        self.metrics.observe(f"{route}.subsets_cached", solver_stats.subsets_cached, COUNT_BUCKETS)
+        if solver_stats.early_exit_size is not None:
+            self.metrics.observe(f"{route}.early_exit_size", solver_stats.early_exit_size, tuple(range(1, 9)))
 
     def get_solution_link(self, request: flk.Request, solution: Expression | None) -> str:
         if solution is None:
             return "None"
-        return request.url_root + "api/solution/" + self.encrypt(solution.to_string())
+        return request.url_root + "api/solution/" + self.encrypt(solution)
 
     @classmethod
-    def init_app(cls, app: flk.Flask) -> None:
-        cls(app)
+    def init_app(
+            cls,
+            app: flk.Flask,
+            solver_pool: SolverPool | None = None,
+            game_buffer: GameBuffer | None = None,
+    ) -> None:
+        cls(app, solver_pool, game_buffer)
 
 
-def create_app() -> flk.Flask:
+def create_app(solver_pool: SolverPool | None = None, game_buffer: GameBuffer | None = None) -> flk.Flask:
     app = flk.Flask(__name__, root_path=os.path.dirname(os.path.dirname(__file__)))
-    _App.init_app(app)
+    _App.init_app(app, solver_pool, game_buffer)
     return app
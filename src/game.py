@@ -1,44 +1,129 @@
 import random
 import time
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from typing import Any, Callable, Self
 
-from .solver.solver import find_one_solution
+from .index.difficulty import get_difficulty_index
+from .index.solvability import MAX_INDEXED_QUANTITY, MissingIndexError, get_solvability_index, has_solvability_index
+from .index.targets import get_target_index
+from .solver.cache import SolutionCache, solution_cache_key
+from .solver.solver import find_integer_and_float_solutions, find_one_solution
+from .solver.stats import SolverStats
 from .utils.expression import Expression
 from .utils.game_options import GameOptions
+from .utils.hands import MAX_NUMBER, MIN_NUMBER
 from .utils.types import number
 
 
-__all__ = ["check_game", "create_game"]
+__all__ = ["GameStats", "check_classic_game", "check_game", "create_game", "create_random_game"]
 
 
-def _get_random(seed: int | float | str | None) -> random.Random:
+_MISSING = object()
+
+
+@dataclass
+class GameStats:
+    hands_rejected: int = 0
+    from_index: bool = False
+    elapsed: float = 0.0
+    solver: SolverStats = field(default_factory=SolverStats)
+
+    def merge(self, other: Self) -> None:
+        self.hands_rejected += other.hands_rejected
+        self.from_index = self.from_index or other.from_index
+        self.elapsed += other.elapsed
+        self.solver.merge(other.solver)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _get_random(seed: int | float | str | random.Random | None) -> random.Random:
     if seed is None:
         return random
+    if isinstance(seed, random.Random):
+        return seed
     return random.Random(seed)
 
 
+def _index_sampler(
+        quantity: int,
+        target: int,
+        options: GameOptions,
+        randomizer: random.Random,
+        prebuilt_only: bool,
+) -> Callable[[], tuple[list[int], Expression]] | None:
+    must_use_all = options.must_use_all
+    if options.difficulty is not None:
+        if quantity > MAX_INDEXED_QUANTITY:
+            raise ValueError(f"Difficulty is only available for up to {MAX_INDEXED_QUANTITY} numbers")
+        if (difficulty_index := get_difficulty_index(quantity, target, must_use_all)) is None:
+            raise MissingIndexError(f"No difficulty index is built for {quantity} numbers and target {target}")
+        return partial(difficulty_index.sample, options, randomizer)
+    if prebuilt_only:
+        if (target_index := get_target_index(quantity, must_use_all)) is None:
+            raise MissingIndexError(f"No target index is built for {quantity} numbers")
+        return partial(target_index.sample, target, options, randomizer)
+    if quantity <= MAX_INDEXED_QUANTITY and has_solvability_index(quantity, target, must_use_all):
+        return partial(get_solvability_index(quantity, target, must_use_all).sample, options, randomizer)
+    if (target_index := get_target_index(quantity, must_use_all)) is not None:
+        return partial(target_index.sample, target, options, randomizer)
+    if quantity <= MAX_INDEXED_QUANTITY:
+        return partial(get_solvability_index(quantity, target, must_use_all).sample, options, randomizer)
+    return None
+
+
 def create_game(
         quantity: int,
         target: int,
         options: GameOptions,
-        seed: number | str | None = None,
+        seed: number | str | random.Random | None = None,
         timeout: number | None = None,
+        prebuilt_only: bool = False,
+        stats: GameStats | None = None,
 ) -> tuple[list[int], Expression, number]:
     assert options.is_valid()[0]
     randomizer = _get_random(seed)
     start_time = time.time()
+    if (sample := _index_sampler(quantity, target, options, randomizer, prebuilt_only)) is not None:
+        numbers, solution = sample()
+        if stats is not None:
+            stats.from_index = True
+        return numbers, solution, time.time() - start_time
+    return create_random_game(quantity, target, options, randomizer, timeout, stats)
+
+
+def create_random_game(
+        quantity: int,
+        target: int,
+        options: GameOptions,
+        seed: number | str | random.Random | None = None,
+        timeout: number | None = None,
+        stats: GameStats | None = None,
+) -> tuple[list[int], Expression, number]:
+    # draws hands until one is solvable, without any index: the fallback for hands above MAX_INDEXED_QUANTITY
+    # with no target index, and the generator the game of the day has always used for its seeds
+    randomizer = _get_random(seed)
+    start_time = time.time()
+    solver_stats = stats.solver if stats is not None else None
     while True:
-        numbers = [randomizer.randint(1, 10) for _ in range(quantity)]
+        numbers = [randomizer.randint(MIN_NUMBER, MAX_NUMBER) for _ in range(quantity)]
         if options.float_only():
-            int_solution = find_one_solution(numbers, target, options.as_integer_solvable())
-            float_solution = find_one_solution(numbers, target, options)
+            int_solution, float_solution = find_integer_and_float_solutions(
+                numbers, target, options, stats=solver_stats,
+            )
             if int_solution is None and float_solution is not None:
                 return numbers, float_solution, time.time() - start_time
         else:
-            if (solution := find_one_solution(numbers, target, options)) is not None:
+            if (solution := find_one_solution(numbers, target, options, stats=solver_stats)) is not None:
                 return numbers, solution, time.time() - start_time
+        if stats is not None:
+            stats.hands_rejected += 1
         if timeout is not None and time.time() - start_time > timeout:
             raise TimeoutError("Timeout reached")
 
+
 def check_game(
         numbers: list[int],
         target: int,
@@ -46,3 +131,30 @@ def check_game(
 ) -> tuple[Expression | None, number]:
     start_time = time.time()
     return find_one_solution(numbers, target, options), time.time() - start_time
+
+
+def check_classic_game(
+        numbers: list[int],
+        target: int,
+        cache: SolutionCache | None = None,
+        solve: Callable[
+            ..., tuple[Expression | None, Expression | None]
+        ] = find_integer_and_float_solutions,
+        stats: SolverStats | None = None,
+) -> tuple[Expression | None, Expression | None, number]:
+    start_time = time.time()
+    options = GameOptions()
+    int_key = solution_cache_key(numbers, target, options.as_integer_solvable())
+    float_key = solution_cache_key(numbers, target, options.as_float_only())
+    if cache is not None:
+        int_solution, float_solution = cache.get_many([int_key, float_key], _MISSING)
+        if int_solution is not _MISSING and float_solution is not _MISSING:
+            return int_solution, float_solution, time.time() - start_time
+    if stats is None:
+        int_solution, float_solution = solve(numbers, target, options)
+    else:
+        int_solution, float_solution = solve(numbers, target, options, stats=stats)
+    if cache is not None:
+        cache.put(int_key, int_solution)
+        cache.put(float_key, float_solution)
+    return int_solution, float_solution, time.time() - start_time
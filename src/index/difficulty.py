@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import os
+import pickle
+import random
+import threading
+
+from ..solver.enumerator import iter_solutions
+from ..utils.expression import BinaryOperation, BiOpExpression, Expression
+from ..utils.game_options import Difficulty, GameOptions
+from ..utils.hands import MAX_NUMBER, MIN_NUMBER, all_hands
+from .solvability import (
+    NoSolvableHandError,
+    SampleBucket,
+    Solvability,
+    SolvabilityIndex,
+    cache_dir,
+    get_solvability_index,
+    has_solvability_index,
+)
+
+
+__all__ = [
+    "DifficultyIndex",
+    "HandFeatures",
+    "get_difficulty_index",
+    "hand_features",
+    "has_difficulty_index",
+]
+
+
+SOLUTION_COUNT_LIMIT = 100
+
+# bumped whenever HandFeatures changes meaning, so stale pickles are never read
+_FEATURES_VERSION = 2
+
+# distinct solutions (capped at SOLUTION_COUNT_LIMIT), fewest subtractions and divisions in a solution
+HandFeatures = tuple[int, int]
+
+_INVERSE_OPERATIONS = {BinaryOperation.SUBTRACTION, BinaryOperation.DIVISION}
+
+
+def _inverse_operation_count(expression: Expression) -> int:
+    if isinstance(expression, BiOpExpression):
+        return (
+            (expression.binary_operation in _INVERSE_OPERATIONS)
+            + _inverse_operation_count(expression.left)
+            + _inverse_operation_count(expression.right)
+        )
+    return 0
+
+
+def hand_features(hand: tuple[int, ...], target: int, must_use_all: bool) -> HandFeatures:
+    count = 0
+    min_inverse_operations = len(hand)
+    options = GameOptions(allow_integer=True, allow_float_only=True, must_use_all=must_use_all)
+    for solution in iter_solutions(list(hand), target, options, SOLUTION_COUNT_LIMIT):
+        count += 1
+        min_inverse_operations = min(min_inverse_operations, _inverse_operation_count(solution))
+    return count, min_inverse_operations
+
+
+def _index_path(quantity: int, target: int, must_use_all: bool) -> str:
+    return os.path.join(
+        cache_dir(),
+        f"difficulty_{quantity}_{target}_{int(must_use_all)}_{MIN_NUMBER}_{MAX_NUMBER}_v{_FEATURES_VERSION}.pickle",
+    )
+
+
+class DifficultyIndex:
+    def __init__(
+            self,
+            solvability: SolvabilityIndex,
+            features: dict[tuple[int, ...], HandFeatures],
+    ) -> None:
+        self.solvability = solvability
+        self._features = features
+        self._buckets: dict[tuple[bool, bool, Difficulty], SampleBucket] = {}
+        self._lock = threading.Lock()
+
+    def features(self, hand: tuple[int, ...]) -> HandFeatures | None:
+        return self._features.get(hand)
+
+    def hardness(self, hand: tuple[int, ...]) -> tuple[bool, int, int]:
+        count, min_inverse_operations = self._features[hand]
+        solvability, _ = self.solvability.lookup(hand)
+        return solvability is Solvability.FLOAT_ONLY, -count, min_inverse_operations
+
+    def hands(self, options: GameOptions) -> list[tuple[int, ...]]:
+        return self._get_bucket(options).hands
+
+    def sample(
+            self,
+            options: GameOptions,
+            randomizer: random.Random,
+    ) -> tuple[list[int], Expression]:
+        bucket = self._get_bucket(options)
+        if not bucket.hands:
+            raise NoSolvableHandError(f"No {options.difficulty} {self.solvability.quantity}-number hand "
+                             f"for target {self.solvability.target} with {options}")
+        index = randomizer.choices(range(len(bucket.hands)), cum_weights=bucket.cum_weights)[0]
+        numbers = list(bucket.hands[index])
+        randomizer.shuffle(numbers)
+        return numbers, bucket.solutions[index]
+
+    def _get_bucket(self, options: GameOptions) -> SampleBucket:
+        key = (options.allow_integer, options.allow_float_only, options.difficulty)
+        if (bucket := self._buckets.get(key)) is not None:
+            return bucket
+        with self._lock:
+            if key in self._buckets:
+                return self._buckets[key]
+            hands = sorted(
+                (hand for hand in self._features if self.solvability.lookup(hand)[0].matches(options)),
+                key=self.hardness,
+            )
+            levels = list(Difficulty)
+            for level, difficulty in enumerate(levels):
+                level_hands = hands[level * len(hands) // len(levels):(level + 1) * len(hands) // len(levels)]
+                self._buckets[(options.allow_integer, options.allow_float_only, difficulty)] = SampleBucket(
+                    level_hands, [self.solvability.lookup(hand)[1] for hand in level_hands],
+                )
+        return self._buckets[key]
+
+    @classmethod
+    def build(cls, solvability: SolvabilityIndex) -> DifficultyIndex:
+        features = {
+            hand: hand_features(hand, solvability.target, solvability.must_use_all)
+            for hand in all_hands(solvability.quantity)
+            if solvability.lookup(hand)[0] is not Solvability.UNSOLVABLE
+        }
+        return cls(solvability, features)
+
+    @classmethod
+    def load_or_build(cls, quantity: int, target: int, must_use_all: bool) -> DifficultyIndex:
+        solvability = get_solvability_index(quantity, target, must_use_all)
+        path = _index_path(quantity, target, must_use_all)
+        if os.path.exists(path):
+            with open(path, "rb") as fd:
+                return cls(solvability, pickle.load(fd))
+        index = cls.build(solvability)
+        os.makedirs(cache_dir(), exist_ok=True)
+        with open(path + ".tmp", "wb") as fd:
+            pickle.dump(index._features, fd)
+        os.replace(path + ".tmp", path)
+        return index
+
+
+_indexes: dict[tuple[int, int, bool], DifficultyIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def has_difficulty_index(quantity: int, target: int, must_use_all: bool) -> bool:
+    return (quantity, target, must_use_all) in _indexes or (
+        os.path.exists(_index_path(quantity, target, must_use_all))
+        and has_solvability_index(quantity, target, must_use_all)
+    )
+
+
+def get_difficulty_index(quantity: int, target: int, must_use_all: bool) -> DifficultyIndex | None:
+    key = (quantity, target, must_use_all)
+    if (index := _indexes.get(key)) is not None:
+        return index
+    if not has_difficulty_index(quantity, target, must_use_all):
+        return None
+    with _indexes_lock:
+        if (index := _indexes.get(key)) is None:
+            index = _indexes[key] = DifficultyIndex.load_or_build(quantity, target, must_use_all)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and persist difficulty indexes.")
+    parser.add_argument("quantity", type=int)
+    parser.add_argument("target", type=int)
+    parser.add_argument("--allow-unused", action="store_true", help="index games where not every number is used")
+    args = parser.parse_args()
+
+    index = DifficultyIndex.load_or_build(args.quantity, args.target, not args.allow_unused)
+    for options in (GameOptions.from_integer_solvable(), GameOptions.from_float_only()):
+        for difficulty in Difficulty:
+            hands = index.hands(options.with_difficulty(difficulty))
+            print(f"{options.with_difficulty(difficulty)}: {len(hands)} hands, e.g. {hands[:3]}")
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import os
+import pickle
+import random
+import threading
+from enum import Enum
+from itertools import accumulate
+
+from ..solver.solver import find_integer_and_float_solutions
+from ..utils.expression import Expression
+from ..utils.game_options import GameOptions
+from ..utils.hands import MAX_NUMBER, MIN_NUMBER, all_hands, permutation_count
+
+
+__all__ = [
+    "MAX_INDEXED_QUANTITY",
+    "MissingIndexError",
+    "NoSolvableHandError",
+    "SampleBucket",
+    "Solvability",
+    "SolvabilityIndex",
+    "cache_dir",
+    "get_solvability_index",
+    "has_solvability_index",
+]
+
+
+MAX_INDEXED_QUANTITY = 5
+
+
+def cache_dir() -> str:
+    return os.environ.get("INDEX_CACHE_DIR", "cache")
+
+
+class NoSolvableHandError(ValueError):
+    pass
+
+
+class MissingIndexError(LookupError):
+    pass
+
+
+class Solvability(Enum):
+    UNSOLVABLE = "unsolvable"
+    INTEGER = "integer"
+    FLOAT_ONLY = "float_only"
+
+    def matches(self, options: GameOptions) -> bool:
+        if self is Solvability.INTEGER:
+            return options.allow_integer
+        if self is Solvability.FLOAT_ONLY:
+            return options.allow_float_only
+        return False
+
+
+class SampleBucket:
+    def __init__(self, hands: list[tuple[int, ...]], solutions: list[Expression]) -> None:
+        self.hands = hands
+        self.solutions = solutions
+        self.cum_weights = list(accumulate(permutation_count(hand) for hand in hands))
+
+
+def _index_path(quantity: int, target: int, must_use_all: bool) -> str:
+    return os.path.join(
+        cache_dir(),
+        f"solvability_{quantity}_{target}_{int(must_use_all)}_{MIN_NUMBER}_{MAX_NUMBER}.pickle",
+    )
+
+
+class SolvabilityIndex:
+    def __init__(
+            self,
+            quantity: int,
+            target: int,
+            must_use_all: bool,
+            entries: dict[tuple[int, ...], tuple[Solvability, Expression | None]],
+    ) -> None:
+        self.quantity = quantity
+        self.target = target
+        self.must_use_all = must_use_all
+        self._entries = entries
+        self._buckets: dict[tuple[bool, bool], SampleBucket] = {}
+
+    def lookup(self, hand: tuple[int, ...]) -> tuple[Solvability, Expression | None]:
+        return self._entries.get(hand, (Solvability.UNSOLVABLE, None))
+
+    def solvable_count(self, options: GameOptions) -> int:
+        return len(self._get_bucket(options).hands)
+
+    def sample(
+            self,
+            options: GameOptions,
+            randomizer: random.Random,
+    ) -> tuple[list[int], Expression]:
+        bucket = self._get_bucket(options)
+        if not bucket.hands:
+            raise NoSolvableHandError(
+                f"No solvable {self.quantity}-number hand for target {self.target} with {options}"
+            )
+        index = randomizer.choices(range(len(bucket.hands)), cum_weights=bucket.cum_weights)[0]
+        numbers = list(bucket.hands[index])
+        randomizer.shuffle(numbers)
+        return numbers, bucket.solutions[index]
+
+    def _get_bucket(self, options: GameOptions) -> SampleBucket:
+        key = (options.allow_integer, options.allow_float_only)
+        if (bucket := self._buckets.get(key)) is None:
+            hands: list[tuple[int, ...]] = []
+            solutions: list[Expression] = []
+            for hand, (solvability, solution) in self._entries.items():
+                if solvability.matches(options):
+                    hands.append(hand)
+                    solutions.append(solution)
+            bucket = self._buckets[key] = SampleBucket(hands, solutions)
+        return bucket
+
+    @classmethod
+    def build(cls, quantity: int, target: int, must_use_all: bool) -> SolvabilityIndex:
+        options = GameOptions(must_use_all=must_use_all)
+        entries: dict[tuple[int, ...], tuple[Solvability, Expression | None]] = {}
+        for hand in all_hands(quantity):
+            int_solution, float_solution = find_integer_and_float_solutions(list(hand), target, options)
+            if int_solution is not None:
+                entries[hand] = (Solvability.INTEGER, int_solution)
+            elif float_solution is not None:
+                entries[hand] = (Solvability.FLOAT_ONLY, float_solution)
+            else:
+                entries[hand] = (Solvability.UNSOLVABLE, None)
+        return cls(quantity, target, must_use_all, entries)
+
+    @classmethod
+    def load_or_build(cls, quantity: int, target: int, must_use_all: bool) -> SolvabilityIndex:
+        path = _index_path(quantity, target, must_use_all)
+        if os.path.exists(path):
+            with open(path, "rb") as fd:
+                entries = {
+                    hand: (Solvability(solvability), solution)
+                    for hand, (solvability, solution) in pickle.load(fd).items()
+                }
+            return cls(quantity, target, must_use_all, entries)
+        index = cls.build(quantity, target, must_use_all)
+        os.makedirs(cache_dir(), exist_ok=True)
+        with open(path + ".tmp", "wb") as fd:
+            pickle.dump({
+                hand: (solvability.value, solution)
+                for hand, (solvability, solution) in index._entries.items()
+            }, fd)
+        os.replace(path + ".tmp", path)
+        return index
+
+
+_indexes: dict[tuple[int, int, bool], SolvabilityIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_solvability_index(quantity: int, target: int, must_use_all: bool) -> SolvabilityIndex:
+    key = (quantity, target, must_use_all)
+    if (index := _indexes.get(key)) is not None:
+        return index
+    with _indexes_lock:
+        if (index := _indexes.get(key)) is None:
+            index = _indexes[key] = SolvabilityIndex.load_or_build(quantity, target, must_use_all)
+    return index
+
+
+def has_solvability_index(quantity: int, target: int, must_use_all: bool) -> bool:
+    return (quantity, target, must_use_all) in _indexes or os.path.exists(_index_path(quantity, target, must_use_all))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and persist solvability indexes.")
+    parser.add_argument("quantity", type=int)
+    parser.add_argument("target", type=int)
+    parser.add_argument("--allow-unused", action="store_true", help="index games where not every number is used")
+    args = parser.parse_args()
+
+    index = get_solvability_index(args.quantity, args.target, not args.allow_unused)
+    for options in (GameOptions.from_integer_solvable(), GameOptions.from_float_only(), GameOptions.from_solvable()):
+        print(f"{options}: {index.solvable_count(options)} solvable hands")
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import mmap
+import os
+import random
+import struct
+import threading
+from bisect import bisect_left
+from math import factorial
+
+from ..utils.expression import Expression, parse_postfix
+from ..utils.game_options import GameOptions
+from ..utils.hands import MAX_NUMBER, MIN_NUMBER, all_hands, permutation_count
+from .solvability import NoSolvableHandError, cache_dir
+
+
+__all__ = ["TargetIndex", "build_target_index", "get_target_index", "target_index_path"]
+
+
+_MAGIC = b"T24S"
+
+# magic, quantity, must use all, low, high, hands, targets, postings, solution bytes
+HEADER = struct.Struct("<4sBBiiIIII")
+
+_INT32_MIN = -(1 << 31)
+_INT32_MAX = (1 << 31) - 1
+
+
+def target_index_path(quantity: int, must_use_all: bool, low: int = MIN_NUMBER, high: int = MAX_NUMBER) -> str:
+    return os.path.join(cache_dir(), f"targets_{quantity}_{int(must_use_all)}_{low}_{high}.bin")
+
+
+def _align(offset: int) -> int:
+    return offset + -offset % 4
+
+
+class TargetIndex:
+    # Layout after the header: hands as bytes, sorted int32 targets, uint32 bounds, uint32 hand ids, then uint32
+    # offsets into the postfix solutions that follow them. Target i is reached exactly by
+    # postings[bounds[2i]:bounds[2i + 1]] and only with fractions by the rest up to bounds[2i + 2], and posting j is
+    # solved by solutions[offsets[j]:offsets[j + 1]].
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as fd:
+            self._mapped = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, quantity, must_use_all, low, high, hand_count, target_count, posting_count, solution_size = (
+            HEADER.unpack_from(self._mapped)
+        )
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a target index, or was built without solutions and must be rebuilt")
+        self.quantity = quantity
+        self.must_use_all = bool(must_use_all)
+        self.low = low
+        self.high = high
+        self._view = view = memoryview(self._mapped)
+        offset = HEADER.size
+        self._hands = view[offset:offset + hand_count * quantity]
+        offset = _align(offset + hand_count * quantity)
+        self._targets = view[offset:offset + target_count * 4].cast("i")
+        offset += target_count * 4
+        self._bounds = view[offset:offset + (2 * target_count + 1) * 4].cast("I")
+        offset += (2 * target_count + 1) * 4
+        self._postings = view[offset:offset + posting_count * 4].cast("I")
+        offset += posting_count * 4
+        self._offsets = view[offset:offset + (posting_count + 1) * 4].cast("I")
+        offset += (posting_count + 1) * 4
+        self._solutions = view[offset:offset + solution_size]
+        self._max_weight = factorial(quantity)
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def hand(self, hand_id: int) -> tuple[int, ...]:
+        return tuple(self._hands[hand_id * self.quantity:(hand_id + 1) * self.quantity])
+
+    def count(self, target: int, options: GameOptions) -> int:
+        integer, float_only = self._ranges(target)
+        return (
+            (integer[1] - integer[0] if options.allow_integer else 0)
+            + (float_only[1] - float_only[0] if options.allow_float_only else 0)
+        )
+
+    def hands(self, target: int, options: GameOptions) -> list[tuple[int, ...]]:
+        integer, float_only = self._ranges(target)
+        return [
+            self.hand(self._postings[position])
+            for (start, end), allowed in ((integer, options.allow_integer), (float_only, options.allow_float_only))
+            if allowed
+            for position in range(start, end)
+        ]
+
+    def sample(
+            self,
+            target: int,
+            options: GameOptions,
+            randomizer: random.Random,
+    ) -> tuple[list[int], Expression]:
+        (integer_start, integer_end), (float_start, float_end) = self._ranges(target)
+        integer_count = integer_end - integer_start if options.allow_integer else 0
+        float_count = float_end - float_start if options.allow_float_only else 0
+        if integer_count + float_count == 0:
+            raise NoSolvableHandError(f"No solvable {self.quantity}-number hand for target {target} with {options}")
+        # uniform pick among hands, accepted in proportion to the deals that produce the hand
+        while True:
+            choice = randomizer.randrange(integer_count + float_count)
+            position = integer_start + choice if choice < integer_count else float_start + choice - integer_count
+            hand = self.hand(self._postings[position])
+            if randomizer.randrange(self._max_weight) < permutation_count(hand):
+                break
+        numbers = list(hand)
+        randomizer.shuffle(numbers)
+        return numbers, parse_postfix(bytes(self._solutions[self._offsets[position]:self._offsets[position + 1]]))
+
+    def _ranges(self, target: int) -> tuple[tuple[int, int], tuple[int, int]]:
+        position = bisect_left(self._targets, target)
+        if position == len(self._targets) or self._targets[position] != target:
+            return (0, 0), (0, 0)
+        start, middle, end = self._bounds[2 * position:2 * position + 3]
+        return (start, middle), (middle, end)
+
+    def close(self) -> None:
+        views = (self._hands, self._targets, self._bounds, self._postings, self._offsets, self._solutions, self._view)
+        for view in views:
+            view.release()
+        self._mapped.close()
+
+
+def build_target_index(
+        quantity: int,
+        must_use_all: bool,
+        low: int = MIN_NUMBER,
+        high: int = MAX_NUMBER,
+        path: str | None = None,
+) -> str:
+    import numpy as np
+
+    from ..solver.vectorised import reachable_values
+
+    if not 0 <= low <= high <= 0xFF:
+        raise ValueError("Indexed numbers must be between 0 and 255")
+    hands = all_hands(quantity, low, high)
+    integer_options = GameOptions(allow_integer=True, allow_float_only=False, must_use_all=must_use_all)
+    any_options = GameOptions(allow_integer=True, allow_float_only=True, must_use_all=must_use_all)
+    columns: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    solutions: list[bytes] = []
+    for hand_id, hand in enumerate(hands):
+        integer_values = reachable_values(list(hand), integer_options)
+        rational_values = reachable_values(list(hand), any_options)
+        integer = integer_values.array()
+        rational = rational_values.array()
+        float_only = np.setdiff1d(rational[rational[:, 1] == 1, 0], integer)
+        for kind, (values, reachable) in enumerate(((integer, integer_values), (float_only, rational_values))):
+            values = values[(values >= _INT32_MIN) & (values <= _INT32_MAX)]
+            columns.append((values, np.full(len(values), kind), np.full(len(values), hand_id)))
+            solutions += (reachable.expression(value).to_postfix() for value in values.tolist())
+
+    values, kinds, hand_ids = (np.concatenate(column) for column in zip(*columns))
+    order = np.lexsort((hand_ids, kinds, values))
+    values, kinds, hand_ids = values[order], kinds[order], hand_ids[order]
+    solutions = [solutions[position] for position in order.tolist()]
+    offsets = np.zeros(len(solutions) + 1, dtype=np.int64)
+    np.cumsum([len(solution) for solution in solutions], out=offsets[1:])
+    if offsets[-1] > 0xFFFFFFFF:
+        raise OverflowError("Target index solutions do not fit 32-bit offsets")
+    targets = np.unique(values)
+    bounds = np.empty(2 * len(targets) + 1, dtype=np.uint32)
+    bounds[0::2] = np.searchsorted(values, targets, side="left").tolist() + [len(values)]
+    bounds[1::2] = np.searchsorted(values * 2 + kinds, targets * 2 + 1, side="left")
+
+    path = path or target_index_path(quantity, must_use_all, low, high)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "wb") as fd:
+        fd.write(HEADER.pack(
+            _MAGIC, quantity, int(must_use_all), low, high, len(hands), len(targets), len(hand_ids), int(offsets[-1]),
+        ))
+        fd.write(np.array(hands, dtype=np.uint8).reshape(-1, quantity).tobytes())
+        fd.write(b"\0" * (-fd.tell() % 4))
+        fd.write(targets.astype("<i4").tobytes())
+        fd.write(bounds.astype("<u4").tobytes())
+        fd.write(hand_ids.astype("<u4").tobytes())
+        fd.write(offsets.astype("<u4").tobytes())
+        fd.write(b"".join(solutions))
+    os.replace(path + ".tmp", path)
+    return path
+
+
+_indexes: dict[tuple[int, bool], TargetIndex | None] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_target_index(quantity: int, must_use_all: bool) -> TargetIndex | None:
+    key = (quantity, must_use_all)
+    if (index := _indexes.get(key)) is not None:
+        return index
+    with _indexes_lock:
+        if (index := _indexes.get(key)) is None:
+            path = target_index_path(quantity, must_use_all)
+            index = _indexes[key] = TargetIndex(path) if os.path.exists(path) else None
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the inverted index from targets to the hands reaching them.")
+    parser.add_argument("quantity", type=int)
+    parser.add_argument("--low", type=int, default=MIN_NUMBER)
+    parser.add_argument("--high", type=int, default=MAX_NUMBER)
+    parser.add_argument("--allow-unused", action="store_true", help="index games where not every number is used")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    index_path = build_target_index(args.quantity, not args.allow_unused, args.low, args.high)
+    built = TargetIndex(index_path)
+    print(f"{len(built)} targets indexed in {index_path} ({os.path.getsize(index_path)} bytes) "
+          f"in {time.perf_counter() - start_time:.1f}s")
+    for options in (GameOptions.from_integer_solvable(), GameOptions.from_float_only()):
+        print(f"{options}: {built.count(24, options)} hands reach 24, {built.count(48, options)} reach 48")
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import threading
+from typing import Any
+
+
+__all__ = ["COUNT_BUCKETS", "Histogram", "LATENCY_BUCKETS", "Metrics"]
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": [
+                {"le": bound, "count": count}
+                for bound, count in zip(self.buckets + ("+Inf",), itertools.accumulate(self.counts))
+            ],
+        }
+
+
+class Metrics:
+    def __init__(self, slowest_size: int = 20) -> None:
+        self._slowest_size = slowest_size
+        self._histograms: dict[str, Histogram] = {}
+        self._slowest: list[tuple[float, int, dict[str, Any]]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def observe_slowest(self, time_taken: float, **details: Any) -> None:
+        entry = (time_taken, next(self._sequence), {"time_taken": time_taken, **details})
+        with self._lock:
+            if len(self._slowest) < self._slowest_size:
+                heapq.heappush(self._slowest, entry)
+            elif time_taken > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "histograms": {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())},
+                "slowest": [details for *_, details in sorted(self._slowest, reverse=True)],
+            }
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Self
+
+import flask as flk
+
+from ..utils.game_options import GameOptions
+from .pool import SolverBusyError
+
+
+__all__ = ["AdmissionControl", "RateLimitedError", "client_ip", "estimate_cost"]
+
+
+# relative solver work per extra number, measured on the meet-in-the-middle engine; a 4-number integer hand costs 1
+_GROWTH = 8
+_BASE_QUANTITY = 4
+_RATIONAL_FACTOR = 3
+
+
+class RateLimitedError(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def client_ip(request: flk.Request, trusted_proxies: int = 0) -> str | None:
+    # each trusted proxy appends the address it received the request from; hops further left are client-supplied
+    if trusted_proxies > 0:
+        hops = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return request.remote_addr
+
+
+def estimate_cost(quantity: int, options: GameOptions) -> float:
+    cost = float(_GROWTH ** max(quantity - _BASE_QUANTITY, 0))
+    if options.allow_float_only:
+        cost *= _RATIONAL_FACTOR
+    return cost
+
+
+class _TokenBucket:
+    def __init__(self, capacity: float, now: float) -> None:
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, rate: float, capacity: float, now: float) -> None:
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+
+class AdmissionControl:
+    MAX_CLIENTS = 10_000
+
+    def __init__(self, rate: float, burst: float, max_backlog: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_backlog = max_backlog
+        self._lock = threading.Lock()
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._backlog = 0.0
+        self._admitted = 0
+        self._rate_limited = 0
+        self._shed = 0
+
+    def acquire(self, client: str | None, cost: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # an idle solver always takes one request, however expensive
+            if self.max_backlog > 0 and self._backlog > 0 and self._backlog + cost > self.max_backlog:
+                self._shed += 1
+                raise SolverBusyError(f"Solver backlog of {self._backlog:.0f} exceeds {self.max_backlog:.0f}")
+            if self.rate > 0:
+                bucket = self._bucket(client or "", now)
+                # a hand costing more than the burst needs a full bucket and leaves it in debt
+                needed = min(cost, self.burst)
+                if bucket.tokens < needed:
+                    self._rate_limited += 1
+                    raise RateLimitedError((needed - bucket.tokens) / self.rate)
+                bucket.tokens -= cost
+            self._backlog += cost
+            self._admitted += 1
+
+    def release(self, cost: float) -> None:
+        with self._lock:
+            self._backlog = max(self._backlog - cost, 0.0)
+
+    @contextmanager
+    def admit(self, client: str | None, cost: float) -> Iterator[None]:
+        self.acquire(client, cost)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "max_backlog": self.max_backlog,
+                "backlog": self._backlog,
+                "clients": len(self._buckets),
+                "admitted": self._admitted,
+                "rate_limited": self._rate_limited,
+                "shed": self._shed,
+            }
+
+    def _bucket(self, client: str, now: float) -> _TokenBucket:
+        if (bucket := self._buckets.get(client)) is None:
+            if len(self._buckets) >= self.MAX_CLIENTS:
+                self._forget_idle(now)
+            bucket = self._buckets[client] = _TokenBucket(self.burst, now)
+        bucket.refill(self.rate, self.burst, now)
+        return bucket
+
+    def _forget_idle(self, now: float) -> None:
+        for client in [
+            client for client, bucket in self._buckets.items()
+            if bucket.tokens + (now - bucket.updated) * self.rate >= self.burst
+        ]:
+            del self._buckets[client]
+
+    @classmethod
+    def from_env(cls) -> Self:
+        return cls(
+            rate=float(os.environ.get("ADMISSION_RATE") or 200),
+            burst=float(os.environ.get("ADMISSION_BURST") or 2000),
+            max_backlog=float(os.environ.get("ADMISSION_MAX_BACKLOG") or 20_000),
+        )
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, Self
+
+
+__all__ = ["AsgiAdapter"]
+
+
+_Scope = dict[str, Any]
+_Receive = Callable[[], Awaitable[dict[str, Any]]]
+_Send = Callable[[dict[str, Any]], Awaitable[None]]
+_WsgiApp = Callable[[dict[str, Any], Callable[..., Any]], Iterable[bytes]]
+
+
+class AsgiAdapter:
+    def __init__(self, wsgi_app: _WsgiApp, max_threads: int, max_pending: int, retry_after: int = 1) -> None:
+        self._wsgi_app = wsgi_app
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="wsgi")
+        self.max_threads = max_threads
+        self.max_pending = max_pending
+        self._retry_after = retry_after
+        self._pending = 0
+        self._rejected = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_threads": self.max_threads,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rejected": self._rejected,
+        }
+
+    async def __call__(self, scope: _Scope, receive: _Receive, send: _Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            await self._send_overloaded(send)
+            return
+        self._pending += 1
+        try:
+            body = await self._read_body(receive)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._run_wsgi, self._build_environ(scope, body), send, loop)
+        finally:
+            self._pending -= 1
+
+    async def _lifespan(self, receive: _Receive, send: _Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _send_overloaded(self, send: _Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(self._retry_after).encode("ascii")),
+            ],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": json.dumps({"error": "Server is overloaded"}).encode("utf-8"),
+        })
+
+    @staticmethod
+    async def _read_body(receive: _Receive) -> bytes:
+        chunks: list[bytes] = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _build_environ(scope: _Scope, body: bytes) -> dict[str, Any]:
+        server_name, server_port = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope["query_string"].decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+            "REMOTE_ADDR": scope["client"][0] if scope.get("client") else "",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        for raw_name, raw_value in scope["headers"]:
+            name = raw_name.decode("latin-1").upper().replace("-", "_")
+            value = raw_value.decode("latin-1")
+            if name == "CONTENT_TYPE" or name == "CONTENT_LENGTH":
+                environ[name] = value
+                continue
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _run_wsgi(self, environ: dict[str, Any], send: _Send, loop: asyncio.AbstractEventLoop) -> None:
+        def send_from_thread(message: dict[str, Any]) -> None:
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response_start: dict[str, Any] = {}
+        started = False
+
+        def send_chunk(chunk: bytes) -> None:
+            nonlocal started
+            if not started:
+                send_from_thread(response_start)
+                started = True
+            if chunk:
+                send_from_thread({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        def start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None) -> Callable:
+            response_start.update({
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers
+                ],
+            })
+            return send_chunk
+
+        result = self._wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                send_chunk(chunk)
+            send_chunk(b"")
+            send_from_thread({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+    @classmethod
+    def from_env(cls, wsgi_app: _WsgiApp) -> Self:
+        return cls(
+            wsgi_app,
+            max_threads=int(os.environ.get("SERVER_THREADS") or 32),
+            max_pending=int(os.environ.get("SERVER_MAX_PENDING") or 256),
+        )
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterator, Self
+
+from ..game import check_game
+from ..solver.cache import SolutionCache, solution_cache_key
+from ..utils.expression import Expression
+from ..utils.game_options import GameOptions
+from ..utils.parse import parse_json_bool_dict, parse_json_int
+from ..utils.types import number
+from .pool import SolverBusyError, SolverPool
+
+
+__all__ = ["BatchItem", "BatchResult", "solve_batch"]
+
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    numbers: list[int]
+    target: int
+    options: GameOptions
+
+    def key(self) -> Hashable:
+        return solution_cache_key(self.numbers, self.target, self.options)
+
+    @classmethod
+    def parse(cls, data: Any, max_quantity: int, default_target: int = 24) -> Self:
+        if not isinstance(data, dict):
+            raise ValueError("Item must be an object")
+        raw_numbers = data.get("numbers")
+        if not isinstance(raw_numbers, list) or not 1 <= len(raw_numbers) <= max_quantity:
+            raise ValueError(f"numbers must be a list of 1 to {max_quantity} integers")
+        numbers = [parse_json_int(number) for number in raw_numbers]
+        if None in numbers:
+            raise ValueError("numbers must be integers")
+        target = parse_json_int(data.get("target", default_target))
+        if target is None:
+            raise ValueError("target must be an integer")
+        raw_options = data.get("options") or {}
+        if not isinstance(raw_options, dict):
+            raise ValueError("options must be an object")
+        options = GameOptions.parse_from_dict(parse_json_bool_dict(raw_options))
+        options_valid, error = options.is_valid()
+        if not options_valid:
+            raise ValueError(error)
+        return cls(numbers, target, options)
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    indices: list[int]
+    solution: Expression | None = None
+    time_taken: number = 0.0
+    cached: bool = False
+    error: str | None = None
+
+
+def _wait_for_one(
+        pending: dict[Future, tuple[Hashable, BatchItem]], pool: SolverPool,
+) -> Iterator[tuple[Hashable, BatchItem, Expression | None, number, str | None]]:
+    done, _ = wait(pending, timeout=pool.timeout, return_when=FIRST_COMPLETED)
+    if not done:
+        for future, (key, item) in list(pending.items()):
+            pool.expire(future)
+            del pending[future]
+            yield key, item, None, 0.0, "Solver timed out"
+        return
+    for future in done:
+        key, item = pending.pop(future)
+        solution, time_taken = future.result()
+        yield key, item, solution, time_taken, None
+
+
+def _solve(
+        groups: dict[Hashable, BatchItem], pool: SolverPool | None,
+) -> Iterator[tuple[Hashable, BatchItem, Expression | None, number, str | None]]:
+    if pool is None:
+        for key, item in groups.items():
+            solution, time_taken = check_game(item.numbers, item.target, item.options)
+            yield key, item, solution, time_taken, None
+        return
+    pending: dict[Future, tuple[Hashable, BatchItem]] = {}
+    for key, item in groups.items():
+        while len(pending) >= pool.workers:
+            yield from _wait_for_one(pending, pool)
+        while True:
+            try:
+                pending[pool.submit(check_game, item.numbers, item.target, item.options)] = key, item
+                break
+            except SolverBusyError:
+                if not pending:
+                    yield key, item, None, 0.0, "Solver is busy, try again later"
+                    break
+                yield from _wait_for_one(pending, pool)
+    while pending:
+        yield from _wait_for_one(pending, pool)
+
+
+def solve_batch(
+        items: list[BatchItem],
+        cache: SolutionCache | None = None,
+        pool: SolverPool | None = None,
+) -> Iterator[BatchResult]:
+    indices: dict[Hashable, list[int]] = {}
+    groups: dict[Hashable, BatchItem] = {}
+    for index, item in enumerate(items):
+        key = item.key()
+        indices.setdefault(key, []).append(index)
+        groups.setdefault(key, item)
+
+    for key in list(groups):
+        if cache is not None and (solution := cache.get(key, _MISSING)) is not _MISSING:
+            del groups[key]
+            yield BatchResult(indices[key], solution, cached=True)
+
+    for key, item, solution, time_taken, error in _solve(groups, pool):
+        if error is None and cache is not None:
+            cache.put(key, solution)
+        yield BatchResult(indices[key], solution, time_taken, error=error)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Self
+
+from ..game import create_game
+from ..utils.expression import Expression
+from ..utils.game_options import GameOptions
+
+
+__all__ = ["GameBuffer"]
+
+
+_Key = tuple[int, int, GameOptions]
+_Game = tuple[list[int], Expression]
+
+
+def _generate_games(quantity: int, target: int, options: GameOptions, count: int) -> list[_Game]:
+    games = []
+    for _ in range(count):
+        numbers, solution, _ = create_game(quantity, target, options)
+        games.append((numbers, solution))
+    return games
+
+
+class _Ring:
+    def __init__(self, depth: int) -> None:
+        self.games: deque[_Game] = deque(maxlen=depth)
+        self.refilling = False
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.failed_refills = 0
+        self.last_refill_latency = 0.0
+        self.total_refill_latency = 0.0
+
+
+class GameBuffer:
+    def __init__(self, depth: int, low_watermark: int, workers: int) -> None:
+        self.depth = depth
+        self.low_watermark = low_watermark
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._lock = threading.RLock()
+        self._rings: dict[_Key, _Ring] = {}
+
+    def pop(self, quantity: int, target: int, options: GameOptions) -> _Game | None:
+        key = (quantity, target, options)
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = _Ring(self.depth)
+            game = ring.games.popleft() if ring.games else None
+            if game is None:
+                ring.misses += 1
+            else:
+                ring.hits += 1
+            self._refill_if_low(key, ring)
+        return game
+
+    def prime(self, keys: list[_Key]) -> None:
+        with self._lock:
+            for key in keys:
+                ring = self._rings.setdefault(key, _Ring(self.depth))
+                self._refill_if_low(key, ring)
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "quantity": quantity,
+                    "target": target,
+                    "options": options.to_dict(),
+                    "occupancy": len(ring.games),
+                    "depth": self.depth,
+                    "hits": ring.hits,
+                    "misses": ring.misses,
+                    "refills": ring.refills,
+                    "failed_refills": ring.failed_refills,
+                    "last_refill_latency": ring.last_refill_latency,
+                    "mean_refill_latency": ring.total_refill_latency / ring.refills if ring.refills else 0.0,
+                }
+                for (quantity, target, options), ring in self._rings.items()
+            ]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _refill_if_low(self, key: _Key, ring: _Ring) -> None:
+        if ring.refilling or len(ring.games) > self.low_watermark:
+            return
+        ring.refilling = True
+        quantity, target, options = key
+        start_time = time.time()
+        future = self._executor.submit(_generate_games, quantity, target, options, self.depth - len(ring.games))
+        future.add_done_callback(lambda done: self._refilled(ring, done, start_time))
+
+    def _refilled(self, ring: _Ring, future: Future, start_time: float) -> None:
+        latency = time.time() - start_time
+        with self._lock:
+            ring.refilling = False
+            if future.cancelled() or future.exception() is not None:
+                ring.failed_refills += 1
+                return
+            ring.games.extend(future.result())
+            ring.refills += 1
+            ring.last_refill_latency = latency
+            ring.total_refill_latency += latency
+
+    @classmethod
+    def from_env(cls) -> Self | None:
+        depth = int(os.environ.get("GAME_BUFFER_DEPTH") or 0)
+        if depth <= 0:
+            return None
+        return cls(
+            depth=depth,
+            low_watermark=int(os.environ.get("GAME_BUFFER_LOW_WATERMARK") or depth // 4),
+            workers=int(os.environ.get("GAME_BUFFER_WORKERS") or 1),
+        )
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import random
+import struct
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Iterator, Self
+
+from ..game import create_game
+from ..index.solvability import MAX_INDEXED_QUANTITY, MissingIndexError, NoSolvableHandError
+from ..tracker.binary import pack_options, unpack_options
+from ..utils.expression import Expression, parse_postfix
+from ..utils.game_options import Difficulty, GameOptions
+from ..utils.parse import parse_json_bool_dict, parse_json_int
+from .pool import SolverBusyError, SolverPool
+
+
+__all__ = [
+    "BULK_SHARD_SIZE",
+    "BulkRequest",
+    "generate_games",
+    "pack_game",
+    "pack_header",
+    "read_games",
+]
+
+
+# games per seed stream; fixed so the output never depends on the number of workers
+BULK_SHARD_SIZE = 64
+
+_MAGIC = b"T24G"
+_VERSION = 1
+
+# magic, version, quantity, options bitfield, target, game count
+HEADER = struct.Struct("<4sBBBiI")
+# solution length, followed by the numbers and the postfix solution
+_GAME = struct.Struct("<H")
+
+_Game = tuple[list[int], Expression]
+
+
+@dataclass(frozen=True)
+class BulkRequest:
+    seed: str
+    count: int
+    quantity: int
+    target: int
+    options: GameOptions
+
+    @classmethod
+    def parse(cls, data: Any, max_count: int, max_quantity: int) -> Self:
+        if not isinstance(data, dict):
+            raise ValueError("Body must be an object")
+        seed = data.get("seed")
+        if not isinstance(seed, (str, int)) or isinstance(seed, bool):
+            raise ValueError("seed must be a string or an integer")
+        count = parse_json_int(data.get("count", 0))
+        if count is None or not 1 <= count <= max_count:
+            raise ValueError(f"count must be between 1 and {max_count}")
+        quantity = parse_json_int(data.get("quantity", 4))
+        if quantity is None or not 1 <= quantity <= max_quantity:
+            raise ValueError(f"quantity must be between 1 and {max_quantity}")
+        target = parse_json_int(data.get("target", 24))
+        if target is None:
+            raise ValueError("target must be an integer")
+        raw_options = data.get("options") or {}
+        if not isinstance(raw_options, dict):
+            raise ValueError("options must be an object")
+        raw_options = dict(raw_options)
+        difficulty = raw_options.pop("difficulty", None)
+        options = GameOptions.parse_from_dict(parse_json_bool_dict(raw_options))
+        if difficulty is not None:
+            if difficulty not in {level.value for level in Difficulty}:
+                raise ValueError(f"difficulty must be one of {', '.join(level.value for level in Difficulty)}")
+            if quantity > MAX_INDEXED_QUANTITY:
+                raise ValueError(f"difficulty is only available for up to {MAX_INDEXED_QUANTITY} numbers")
+            options = options.with_difficulty(Difficulty(difficulty))
+        options_valid, error = options.is_valid()
+        if not options_valid:
+            raise ValueError(error)
+        return cls(str(seed), count, quantity, target, options)
+
+
+def _generate_shard(seed: str, shard: int, count: int, quantity: int, target: int, options: GameOptions) -> list[_Game]:
+    randomizer = random.Random(f"{seed}/{shard}")
+    games = []
+    for _ in range(count):
+        # prebuilt indexes only: one fixed sampling path, and no search that could run forever
+        numbers, solution, _ = create_game(quantity, target, options, randomizer, prebuilt_only=True)
+        games.append((numbers, solution))
+    return games
+
+
+def _result(future: Future, pool: SolverPool) -> list[_Game]:
+    try:
+        return future.result(timeout=pool.timeout)
+    except TimeoutError:
+        pool.expire(future)
+        raise
+
+
+def generate_games(
+        seed: str, count: int, quantity: int, target: int,
+        options: GameOptions,
+        pool: SolverPool | None = None,
+) -> Iterator[_Game]:
+    shards = [
+        (shard, min(BULK_SHARD_SIZE, count - start))
+        for shard, start in enumerate(range(0, count, BULK_SHARD_SIZE))
+    ]
+    if pool is None:
+        for shard, shard_count in shards:
+            yield from _generate_shard(seed, shard, shard_count, quantity, target, options)
+        return
+    pending: deque[Future] = deque()
+    for shard, shard_count in shards:
+        while len(pending) >= pool.workers:
+            yield from _result(pending.popleft(), pool)
+        while True:
+            try:
+                pending.append(pool.submit(_generate_shard, seed, shard, shard_count, quantity, target, options))
+                break
+            except SolverBusyError:
+                if not pending:
+                    raise
+                yield from _result(pending.popleft(), pool)
+    while pending:
+        yield from _result(pending.popleft(), pool)
+
+
+def pack_header(quantity: int, target: int, options: GameOptions, count: int) -> bytes:
+    return HEADER.pack(_MAGIC, _VERSION, quantity, pack_options(options), target, count)
+
+
+def pack_game(numbers: list[int], solution: Expression) -> bytes:
+    postfix = solution.to_postfix()
+    return _GAME.pack(len(postfix)) + bytes(numbers) + postfix
+
+
+def read_games(data: bytes) -> tuple[int, GameOptions, list[_Game]]:
+    magic, version, quantity, option_bits, target, count = HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Not a bulk game file")
+    offset = HEADER.size
+    games = []
+    for _ in range(count):
+        (length,) = _GAME.unpack_from(data, offset)
+        offset += _GAME.size
+        numbers = list(data[offset:offset + quantity])
+        offset += quantity
+        games.append((numbers, parse_postfix(data[offset:offset + length])))
+        offset += length
+    return target, unpack_options(option_bits), games
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+    import time
+
+    presets = {
+        "integer": GameOptions.from_integer_solvable(),
+        "float_only": GameOptions.from_float_only(),
+        "solvable": GameOptions.from_solvable(),
+    }
+    parser = argparse.ArgumentParser(description="Generate reproducible games in bulk.")
+    parser.add_argument("seed")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--quantity", type=int, default=4)
+    parser.add_argument("--target", type=int, default=24)
+    parser.add_argument("--options", choices=list(presets), default="integer")
+    parser.add_argument("--difficulty", choices=[level.value for level in Difficulty])
+    parser.add_argument("--allow-unused", action="store_true", help="allow games where not every number is used")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes, 0 to generate in-process")
+    parser.add_argument("--format", choices=["ndjson", "binary"], default="ndjson")
+    parser.add_argument("--output", help="file to write, defaults to stdout")
+    args = parser.parse_args()
+    if args.difficulty and args.quantity > MAX_INDEXED_QUANTITY:
+        parser.error(f"--difficulty is only available for up to {MAX_INDEXED_QUANTITY} numbers")
+
+    game_options = GameOptions(
+        allow_integer=presets[args.options].allow_integer,
+        allow_float_only=presets[args.options].allow_float_only,
+        must_use_all=not args.allow_unused,
+        difficulty=Difficulty(args.difficulty) if args.difficulty else None,
+    )
+    solver_pool = SolverPool(args.workers, args.workers * 2) if args.workers > 0 else None
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    start_time = time.perf_counter()
+    try:
+        if args.format == "binary":
+            output.write(pack_header(args.quantity, args.target, game_options, args.count))
+        games = generate_games(args.seed, args.count, args.quantity, args.target, game_options, solver_pool)
+        for index, (game_numbers, game_solution) in enumerate(games):
+            if args.format == "binary":
+                output.write(pack_game(game_numbers, game_solution))
+            else:
+                line = {"index": index, "numbers": game_numbers, "solution": game_solution.to_string()}
+                output.write((json.dumps(line) + "\n").encode("utf-8"))
+    except (MissingIndexError, NoSolvableHandError) as error:
+        parser.exit(1, f"{error}\n")
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        if solver_pool is not None:
+            solver_pool.shutdown()
+    elapsed = time.perf_counter() - start_time
+    print(f"{args.count} games in {elapsed:.2f}s ({args.count / elapsed:.0f} games/s)", file=sys.stderr)
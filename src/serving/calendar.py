@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import os
+import pickle
+import threading
+from typing import Self
+
+from ..game import create_random_game
+from ..index.solvability import cache_dir
+from ..utils.expression import Expression
+from ..utils.game_options import GameOptions
+
+
+__all__ = ["GameCalendar", "seconds_until_midnight", "utc_today"]
+
+
+DEFAULT_SALT = "09sdfjgn1o3iua0s9dfij12k34j"
+
+_Game = tuple[list[int], Expression]
+
+
+def utc_today() -> datetime.date:
+    return datetime.datetime.now(datetime.UTC).date()
+
+
+def seconds_until_midnight(now: datetime.datetime | None = None) -> int:
+    now = now or datetime.datetime.now(datetime.UTC)
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), datetime.UTC)
+    return max(int((midnight - now).total_seconds()), 0)
+
+
+class GameCalendar:
+    QUANTITY = 4
+    TARGET = 24
+    OPTIONS = GameOptions.from_solvable()
+
+    def __init__(self, salt: str, path: str | None, window: int) -> None:
+        self.salt = salt
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+        self._games: dict[str, _Game] = self._load()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, date: datetime.date) -> _Game:
+        key = date.isoformat()
+        with self._lock:
+            if (game := self._games.get(key)) is not None:
+                self._hits += 1
+                return game
+            self._misses += 1
+        game = self._generate(key)
+        with self._lock:
+            game = self._games.setdefault(key, game)
+            self._save()
+        return game
+
+    def prefill(self, start: datetime.date | None = None, days: int | None = None) -> int:
+        start = start or utc_today()
+        generated = 0
+        with self._lock:
+            for offset in range(self.window if days is None else days):
+                key = (start + datetime.timedelta(days=offset)).isoformat()
+                if key not in self._games:
+                    self._games[key] = self._generate(key)
+                    generated += 1
+            stale = (start - datetime.timedelta(days=1)).isoformat()
+            for key in [key for key in self._games if key < stale]:
+                del self._games[key]
+            self._save()
+        return generated
+
+    @staticmethod
+    def etag(date: datetime.date, game: _Game) -> str:
+        numbers, solution = game
+        digest = hashlib.sha256(f"{date.isoformat()}{numbers}{solution}".encode("utf-8")).hexdigest()
+        return digest[:16]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "days": len(self._games),
+                "window": self.window,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _generate(self, key: str) -> _Game:
+        numbers, solution, _ = create_random_game(self.QUANTITY, self.TARGET, self.OPTIONS, key + self.salt)
+        return numbers, solution
+
+    def _load(self) -> dict[str, _Game]:
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        with open(self.path, "rb") as fd:
+            return pickle.load(fd)
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "wb") as fd:
+            pickle.dump(self._games, fd)
+        os.replace(self.path + ".tmp", self.path)
+
+    @classmethod
+    def from_env(cls) -> Self:
+        salt = os.environ.get("SALT_TODAY", DEFAULT_SALT)
+        salt_digest = hashlib.sha256(salt.encode("utf-8")).hexdigest()[:12]
+        return cls(
+            salt=salt,
+            path=os.environ.get("TODAY_CACHE_PATH") or os.path.join(cache_dir(), f"today_{salt_digest}.pickle"),
+            window=int(os.environ.get("TODAY_WINDOW") or 7),
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-generate upcoming games of the day.")
+    parser.add_argument("--days", type=int, help="days to generate from today, defaults to TODAY_WINDOW")
+    args = parser.parse_args()
+
+    calendar = GameCalendar.from_env()
+    generated = calendar.prefill(days=args.days)
+    print(f"{generated} games generated, {calendar.stats()['days']} days stored in {calendar.path}")
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Self
+
+from ..solver.memo import combine_memo_stats, get_reachable_memo
+
+
+__all__ = ["SolverBusyError", "SolverPool"]
+
+
+class SolverBusyError(Exception):
+    pass
+
+
+_reports: multiprocessing.Queue | None = None
+
+
+def _init_worker(reports: multiprocessing.Queue) -> None:
+    global _reports
+    _reports = reports
+
+
+def _run_and_report(fn: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return fn(*args)
+    finally:
+        _reports.put((os.getpid(), get_reachable_memo().stats()))
+
+
+class SolverPool:
+    def __init__(self, workers: int, max_pending: int, timeout: float | None = None) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        context = multiprocessing.get_context("spawn")
+        # each worker reports its reachable-value memo after every task, drained as tasks complete
+        self._reports = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(self._reports,),
+        )
+        self._lock = threading.Lock()
+        self._worker_memos: dict[int, dict[str, int | float]] = {}
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self._rejected += 1
+                raise SolverBusyError(f"{self._in_flight} solver tasks already pending")
+            self._in_flight += 1
+        future = self._executor.submit(_run_and_report, fn, *args)
+        future.add_done_callback(self._task_done)
+        return future
+
+    def expire(self, future: Future) -> None:
+        future.cancel()
+        with self._lock:
+            self._timed_out += 1
+
+    def run(self, fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=timeout if timeout is not None else self.timeout)
+        except TimeoutError:
+            self.expire(future)
+            raise
+
+    def queue_depth(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> dict[str, int | float | None]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "timeout": self.timeout,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+            }
+
+    def memo_stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._drain_reports()
+            workers = [{"pid": pid, **stats} for pid, stats in sorted(self._worker_memos.items())]
+        return {
+            **combine_memo_stats(workers),
+            "workers": workers,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _task_done(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            self._drain_reports()
+
+    def _drain_reports(self) -> None:
+        while True:
+            try:
+                pid, stats = self._reports.get_nowait()
+            except queue.Empty:
+                return
+            self._worker_memos[pid] = stats
+
+    @classmethod
+    def from_env(cls) -> Self:
+        workers = int(os.environ.get("SOLVER_WORKERS") or os.cpu_count() or 1)
+        return cls(
+            workers=workers,
+            max_pending=int(os.environ.get("SOLVER_MAX_PENDING") or workers * 4),
+            timeout=float(os.environ.get("SOLVER_TIMEOUT") or 10),
+        )
@@ -1,49 +1,30 @@
 from __future__ import annotations
 
 from collections import defaultdict
+from typing import Callable
 
-from ..utils.expression import BiOpExpression, Expression, NumberExpression
+from ..utils.expression import Expression, NumberExpression
 from ..utils.flat_chain import flat_chain
 from ..utils.game_options import GameOptions
 from ..utils.number_combination_vector import NumberCombinationVector
 from ..utils.types import number
+from .arithmetic import Arithmetic, from_rational
+from .operations import BackPointer, Value, binary_operation, build_expression, leaf_value, uses_rationals
 
 
 __all__ = ["all_results", "find_solution_for_target"]
 
 
-def _divide(
-        a_val: number, b_val: number, a_exp: Expression, b_exp: Expression,
-        memo: dict[number, Expression], integer_only: bool
-) -> None:
-    if b_val == 0:
-        return
-    if integer_only:
-        div, mod = divmod(a_val, b_val)
-        if mod == 0:
-            memo[div] = BiOpExpression.div(a_exp, b_exp)
-    else:
-        memo[a_val / b_val] = BiOpExpression.div(a_exp, b_exp)
+def _results_getter(
+        memo: dict[int, dict[NumberCombinationVector, dict[Value, BackPointer]]],
+) -> Callable[[NumberCombinationVector], dict[Value, BackPointer]]:
+    return lambda combination: memo[combination.total_count()][combination]
 
 
-def _binary_operation(
-        a: dict[number, Expression], b: dict[number, Expression],
-        memo: dict[number, Expression] | None = None,
-        integer_only: bool = True,
+def all_results(
+        numbers: list[number], options: GameOptions,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
 ) -> dict[number, Expression]:
-    results = dict() if memo is None else memo
-    for a_val, a_exp in a.items():
-        for b_val, b_exp in b.items():
-            results[a_val + b_val] = BiOpExpression.add(a_exp, b_exp)
-            results[a_val - b_val] = BiOpExpression.sub(a_exp, b_exp)
-            results[b_val - a_val] = BiOpExpression.sub(b_exp, a_exp)
-            results[a_val * b_val] = BiOpExpression.mul(a_exp, b_exp)
-            _divide(a_val, b_val, a_exp, b_exp, results, integer_only)
-            _divide(b_val, a_val, b_exp, a_exp, results, integer_only)
-    return results
-
-
-def all_results(numbers: list[number], options: GameOptions) -> dict[number, Expression]:
     total_count = len(numbers)
     if total_count == 0:
         return dict()
@@ -58,11 +39,12 @@ def all_results(numbers: list[number], options: GameOptions) -> dict[number, Exp
             return dict()
         return {number: NumberExpression(number) for number in numbers}
 
+    rational = uses_rationals(options, arithmetic)
     empty_vector = NumberCombinationVector.init(numbers)
     total_vector = empty_vector.add_numbers(numbers)
-    memo: dict[int, dict[NumberCombinationVector, dict[number, Expression]]] = defaultdict(lambda: defaultdict(dict))
+    memo: dict[int, dict[NumberCombinationVector, dict[Value, BackPointer]]] = defaultdict(lambda: defaultdict(dict))
     memo[1] = {
-        empty_vector.add_number(number): {number: NumberExpression(number)}
+        empty_vector.add_number(number): {leaf_value(number, rational): NumberExpression(number)}
         for number in numbers
     }
 
@@ -73,33 +55,46 @@ def all_results(numbers: list[number], options: GameOptions) -> dict[number, Exp
             for i in range(min(curr_count, total_count - curr_count), 0, -1)
         ]
 
+        visited_pairs: set[tuple[NumberCombinationVector, NumberCombinationVector]] = set()
         for focused_combination, focused_results in focused_memo.items():
             for other_combination, other_results in flat_chain(other_itemss):
+                if (other_combination, focused_combination) in visited_pairs:
+                    continue
+                visited_pairs.add((focused_combination, other_combination))
                 combined_combination = focused_combination + other_combination
                 if not (combined_combination <= total_vector):
                     continue
                 combined_total_count = combined_combination.total_count()
                 combined_results = memo[combined_total_count][combined_combination]
-                _binary_operation(focused_results, other_results, combined_results, options.integer_solvable())
+                binary_operation(
+                    focused_results, other_results, combined_results,
+                    focused_combination, other_combination, options.integer_solvable(), arithmetic,
+                )
 
+    results_of = _results_getter(memo)
     if options.must_use_all:
-        return {
-            result: expression
-            for comb_result_dict in memo[total_count].values()
-            for result, expression in comb_result_dict.items()
+        found = {
+            result: combination
+            for combination, comb_result_dict in memo[total_count].items()
+            for result in comb_result_dict
         }
     else:
-        return {
-            result: expression
+        found = {
+            result: combination
             for memo_i in memo.values()
-            for comb_result_dict in memo_i.values()
-            for result, expression in comb_result_dict.items()
+            for combination, comb_result_dict in memo_i.items()
+            for result in comb_result_dict
         }
+    return {
+        from_rational(result) if rational else result: build_expression(results_of, combination, result)
+        for result, combination in found.items()
+    }
 
 
 def find_solution_for_target(
         numbers: list[number], target: number,
         options: GameOptions,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
 ) -> Expression | None:
     total_count = len(numbers)
     if total_count == 0:
@@ -117,13 +112,15 @@ def find_solution_for_target(
     if not options.solvable():
         return None
 
+    rational = uses_rationals(options, arithmetic)
     empty_vector = NumberCombinationVector.init(numbers)
     total_vector = empty_vector.add_numbers(numbers)
-    memo: dict[int, dict[NumberCombinationVector, dict[number, Expression]]] = defaultdict(lambda: defaultdict(dict))
+    memo: dict[int, dict[NumberCombinationVector, dict[Value, BackPointer]]] = defaultdict(lambda: defaultdict(dict))
     memo[1] = {
-        empty_vector.add_number(number): {number: NumberExpression(number)}
+        empty_vector.add_number(number): {leaf_value(number, rational): NumberExpression(number)}
         for number in numbers
     }
+    target_key = leaf_value(target, rational)
 
     for curr_count in range(1, total_count):
         focused_memo = memo[curr_count]
@@ -132,24 +129,33 @@ def find_solution_for_target(
             for i in range(min(curr_count, total_count - curr_count), 0, -1)
         ]
 
+        visited_pairs: set[tuple[NumberCombinationVector, NumberCombinationVector]] = set()
         for focused_combination, focused_results in focused_memo.items():
             for other_combination, other_results in flat_chain(other_itemss):
+                if (other_combination, focused_combination) in visited_pairs:
+                    continue
+                visited_pairs.add((focused_combination, other_combination))
                 combined_combination = focused_combination + other_combination
                 if not (combined_combination <= total_vector):
                     continue
                 combined_total_count = combined_combination.total_count()
                 combined_results = memo[combined_total_count][combined_combination]
-                _binary_operation(focused_results, other_results, combined_results, options.integer_solvable())
+                binary_operation(
+                    focused_results, other_results, combined_results,
+                    focused_combination, other_combination, options.integer_solvable(), arithmetic,
+                )
                 if (
                         (not options.must_use_all or combined_total_count == total_count)
-                        and target in combined_results
+                        and target_key in combined_results
                 ):
-                    return combined_results[target]
+                    return build_expression(_results_getter(memo), combined_combination, target_key)
 
-    for comb_result_dict in memo[total_count].values():
-        for result, expression in comb_result_dict.items():
+    if rational or options.integer_solvable():
+        return None
+    for combination, comb_result_dict in memo[total_count].items():
+        for result in comb_result_dict:
             if abs(result - target) < 1e-6:
-                return expression
+                return build_expression(_results_getter(memo), combination, result)
     return None
 
 
@@ -161,6 +167,8 @@ if __name__ == "__main__":
     assert find_solution_for_target([11, 11, 11, 11], 24, default_options) is None
     assert find_solution_for_target([1, 3, 4, 6], 24, default_options) is None
     assert find_solution_for_target([1, 3, 4, 6], 24, float_allowed_options) is not None
+    assert find_solution_for_target([3, 3, 8, 8], 24, float_allowed_options) is not None
+    assert find_solution_for_target([3, 3, 8, 8], 24, float_allowed_options, Arithmetic.FLOAT) is not None
     assert find_solution_for_target([1, 7, 13, 37], 1, default_options) is None
     assert find_solution_for_target([1, 7, 13, 37], 1, GameOptions(must_use_all=False)) is not None
 
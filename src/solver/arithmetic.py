@@ -0,0 +1,26 @@
+from enum import Enum
+from fractions import Fraction
+
+from ..utils.types import number
+
+
+__all__ = ["Arithmetic", "Rational", "from_rational", "to_rational"]
+
+
+Rational = tuple[int, int]
+
+
+class Arithmetic(Enum):
+    EXACT = "exact"
+    FLOAT = "float"
+
+
+def to_rational(value: number) -> Rational:
+    return value.as_integer_ratio()
+
+
+def from_rational(value: Rational) -> number:
+    numerator, denominator = value
+    if denominator == 1:
+        return numerator
+    return Fraction(numerator, denominator)
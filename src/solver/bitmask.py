@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from ..utils.expression import Expression, NumberExpression
+from ..utils.game_options import GameOptions
+from ..utils.types import number
+from .arithmetic import Arithmetic, from_rational
+from .operations import binary_operation, build_expression, leaf_value, uses_rationals
+from .stats import SolverStats
+from .subsets import SubsetLayout, init_memo, record_exit, record_split, record_splits, results_getter, subset_results
+
+
+__all__ = ["all_results", "find_solution_for_target"]
+
+
+def all_results(
+        numbers: list[number], options: GameOptions,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
+) -> dict[number, Expression]:
+    total_count = len(numbers)
+    if total_count == 0:
+        return dict()
+    elif total_count == 1:
+        return {
+            number: NumberExpression(number)
+            for number in numbers
+        }
+
+    if not options.solvable():
+        if options.must_use_all:
+            return dict()
+        return {number: NumberExpression(number) for number in numbers}
+
+    rational = uses_rationals(options, arithmetic)
+    layout = SubsetLayout(numbers)
+    memo = init_memo(layout, rational)
+    integer_only = options.integer_solvable()
+
+    for size in range(2, total_count + 1):
+        for mask in layout.masks_by_size[size]:
+            memo[mask] = subset_results(layout, memo, mask, rational, integer_only, arithmetic, None)
+
+    masks = (
+        [layout.full_mask]
+        if options.must_use_all
+        else [mask for masks in layout.masks_by_size for mask in masks]
+    )
+    found = {
+        result: mask
+        for mask in masks
+        for result in memo[mask]
+    }
+    results_of = results_getter(layout, memo)
+    return {
+        from_rational(result) if rational else result: build_expression(results_of, layout.hands[mask], result)
+        for result, mask in found.items()
+    }
+
+
+def find_solution_for_target(
+        numbers: list[number], target: number,
+        options: GameOptions,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
+        stats: SolverStats | None = None,
+) -> Expression | None:
+    total_count = len(numbers)
+    if total_count == 0:
+        return None
+    elif total_count == 1:
+        return (
+            NumberExpression(numbers[0])
+            if numbers[0] == target
+            else None
+        )
+
+    if not options.must_use_all and target in numbers:
+        return NumberExpression(target)
+
+    if not options.solvable():
+        return None
+
+    rational = uses_rationals(options, arithmetic)
+    layout = SubsetLayout(numbers)
+    memo = init_memo(layout, rational)
+    integer_only = options.integer_solvable()
+    target_key = leaf_value(target, rational)
+    results_of = results_getter(layout, memo)
+    hands = layout.hands
+
+    full_mask = layout.full_mask
+    full_results = memo[full_mask] = {}
+    full_splits_by_size = layout.splits_by_size(full_mask)
+    record_splits(stats, full_mask, sum(map(len, full_splits_by_size)))
+
+    for size in range(1, total_count):
+        if size > 1:
+            for mask in layout.masks_by_size[size]:
+                results = memo[mask] = subset_results(layout, memo, mask, rational, integer_only, arithmetic, stats)
+                if not options.must_use_all and target_key in results:
+                    record_exit(stats, size, memo)
+                    return build_expression(results_of, hands[mask], target_key)
+        for focused, other in full_splits_by_size[size]:
+            expanded = binary_operation(
+                memo[focused], memo[other], full_results, hands[focused], hands[other], integer_only, arithmetic
+            )
+            record_split(stats, memo[focused], memo[other], expanded)
+            if target_key in full_results:
+                record_exit(stats, size, memo)
+                return build_expression(results_of, hands[full_mask], target_key)
+    record_exit(stats, None, memo)
+
+    if rational or integer_only:
+        return None
+    for result in full_results:
+        if abs(result - target) < 1e-6:
+            return build_expression(results_of, hands[full_mask], result)
+    return None
+
+
+if __name__ == "__main__":
+    default_options = GameOptions.from_integer_solvable()
+    float_allowed_options = GameOptions.from_float_only()
+    assert find_solution_for_target([2, 10, 2, 2], 24, default_options) is not None
+    assert find_solution_for_target([1, 4, 7, 9], 24, default_options) is not None
+    assert find_solution_for_target([11, 11, 11, 11], 24, default_options) is None
+    assert find_solution_for_target([1, 3, 4, 6], 24, default_options) is None
+    assert find_solution_for_target([1, 3, 4, 6], 24, float_allowed_options) is not None
+    assert find_solution_for_target([3, 3, 8, 8], 24, float_allowed_options) is not None
+    assert find_solution_for_target([1, 7, 13, 37], 1, default_options) is None
+    assert find_solution_for_target([1, 7, 13, 37], 1, GameOptions(must_use_all=False)) is not None
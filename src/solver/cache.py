@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from ..utils.game_options import GameOptions
+from ..utils.hands import canonical_hand
+
+
+__all__ = ["SolutionCache", "solution_cache_key"]
+
+
+_MISSING = object()
+
+
+def solution_cache_key(numbers: list[int], target: int, options: GameOptions) -> Hashable:
+    return canonical_hand(numbers), target, options
+
+
+class _MemoryStore:
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> tuple[float, Any] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, created: float, value: Any) -> int:
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _SqliteStore:
+    def __init__(self, path: str, max_size: int) -> None:
+        self._max_size = max_size
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "key TEXT PRIMARY KEY, created REAL NOT NULL, accessed REAL NOT NULL, value BLOB NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS solutions_accessed ON solutions (accessed)")
+
+    def get(self, key: Hashable) -> tuple[float, Any] | None:
+        row = self._connection.execute(
+            "UPDATE solutions SET accessed = ? WHERE key = ? RETURNING created, value",
+            (time.time(), repr(key)),
+        ).fetchone()
+        if row is None:
+            return None
+        created, value = row
+        return created, pickle.loads(value)
+
+    def put(self, key: Hashable, created: float, value: Any) -> int:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO solutions (key, created, accessed, value) VALUES (?, ?, ?, ?)",
+            (repr(key), created, time.time(), pickle.dumps(value)),
+        )
+        return self._connection.execute(
+            "DELETE FROM solutions WHERE key IN "
+            "(SELECT key FROM solutions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self._max_size,),
+        ).rowcount
+
+    def delete(self, key: Hashable) -> None:
+        self._connection.execute("DELETE FROM solutions WHERE key = ?", (repr(key),))
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+
+class SolutionCache:
+    def __init__(self, max_size: int = 4096, ttl: float | None = None, shared_path: str | None = None) -> None:
+        self._ttl = ttl
+        self._store = _MemoryStore(max_size) if shared_path is None else _SqliteStore(shared_path, max_size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.get_many([key], default)[0]
+
+    def get_many(self, keys: list[Hashable], default: Any = None) -> list[Any]:
+        # one hit when every key is cached, one miss otherwise
+        with self._lock:
+            values = [self._lookup(key) for key in keys]
+            if any(value is _MISSING for value in values):
+                self.misses += 1
+            else:
+                self.hits += 1
+            return [default if value is _MISSING else value for value in values]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self.evictions += self._store.put(key, time.time(), value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if (value := self.get(key, _MISSING)) is not _MISSING:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._store.get(key)
+        if entry is None:
+            return _MISSING
+        created, value = entry
+        if self._ttl is None or time.time() - created <= self._ttl:
+            return value
+        self._store.delete(key)
+        self.evictions += 1
+        return _MISSING
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._store),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import time
+from fractions import Fraction
+from typing import Iterator, NamedTuple
+
+from ..utils.expression import BinaryOperation, BiOpExpression, Expression, NumberExpression
+from ..utils.game_options import GameOptions
+from ..utils.types import number
+
+
+__all__ = ["count_solutions", "iter_solutions"]
+
+
+Key = tuple
+
+_SUM = "+"
+_PRODUCT = "*"
+_NUMBER = "n"
+
+
+class _Item(NamedTuple):
+    value: int | Fraction
+    expression: Expression
+    key: Key
+    fractional: bool
+
+
+def _terms(key: Key, tag: str) -> tuple[tuple[Key, ...], tuple[Key, ...]]:
+    if key[0] == tag:
+        return key[1], key[2]
+    return (key,), ()
+
+
+def _chain_key(tag: str, a: Key, b: Key, inverse: bool) -> Key:
+    a_positive, a_negative = _terms(a, tag)
+    b_positive, b_negative = _terms(b, tag)
+    if inverse:
+        b_positive, b_negative = b_negative, b_positive
+    return tag, tuple(sorted(a_positive + b_positive)), tuple(sorted(a_negative + b_negative))
+
+
+_CHAINS = {
+    BinaryOperation.ADDITION: (_SUM, False),
+    BinaryOperation.SUBTRACTION: (_SUM, True),
+    BinaryOperation.MULTIPLICATION: (_PRODUCT, False),
+    BinaryOperation.DIVISION: (_PRODUCT, True),
+}
+
+_Result = tuple[int | Fraction, BinaryOperation, _Item, _Item, bool]
+
+
+def _make_item(value: int | Fraction, operation: BinaryOperation, x: _Item, y: _Item, fractional: bool) -> _Item:
+    tag, inverse = _CHAINS[operation]
+    expression = BiOpExpression(operation, x.expression, y.expression)
+    return _Item(value, expression, _chain_key(tag, x.key, y.key, inverse), fractional)
+
+
+def _combine(a: _Item, b: _Item, integer_only: bool) -> Iterator[_Result]:
+    fractional = a.fractional or b.fractional
+    yield a.value + b.value, BinaryOperation.ADDITION, a, b, fractional
+    yield a.value * b.value, BinaryOperation.MULTIPLICATION, a, b, fractional
+    for x, y in ((a, b), (b, a)):
+        yield x.value - y.value, BinaryOperation.SUBTRACTION, x, y, fractional
+        if y.value == 0:
+            continue
+        if x.value % y.value == 0:
+            value = x.value // y.value
+        elif integer_only:
+            continue
+        else:
+            value = Fraction(x.value, y.value)
+        yield value, BinaryOperation.DIVISION, x, y, fractional or value.denominator != 1
+
+
+def _finish(a: _Item, b: _Item, target: number) -> Iterator[_Result]:
+    fractional = a.fractional or b.fractional
+    if a.value + b.value == target:
+        yield target, BinaryOperation.ADDITION, a, b, fractional
+    if a.value * b.value == target:
+        yield target, BinaryOperation.MULTIPLICATION, a, b, fractional
+    for x, y in ((a, b), (b, a)):
+        if x.value - y.value == target:
+            yield target, BinaryOperation.SUBTRACTION, x, y, fractional
+        if y.value != 0 and x.value == target * y.value:
+            yield target, BinaryOperation.DIVISION, x, y, fractional
+
+
+class _Search:
+    def __init__(self, target: number, options: GameOptions, deadline: float | None) -> None:
+        self.target = target
+        self.integer_only = options.integer_solvable()
+        self.float_only = options.float_only()
+        self.must_use_all = options.must_use_all
+        self.deadline = deadline
+        self.seen: set[Key] = set()
+
+    def accept(self, item: _Item) -> bool:
+        if item.value != self.target or (self.float_only and not item.fractional) or item.key in self.seen:
+            return False
+        self.seen.add(item.key)
+        return True
+
+    def solutions(self, items: list[_Item]) -> Iterator[Expression]:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise TimeoutError("Timeout reached")
+        if len(items) == 1 or not self.must_use_all:
+            for item in items:
+                if self.accept(item):
+                    yield item.expression
+        tried: set[tuple[Key, Key]] = set()
+        for i in range(len(items)):
+            for j in range(i + 1, len(items)):
+                pair = (items[i].key, items[j].key) if items[i].key <= items[j].key else (items[j].key, items[i].key)
+                if pair in tried:
+                    continue
+                tried.add(pair)
+                rest = items[:i] + items[i + 1:j] + items[j + 1:]
+                if not rest:
+                    for result in _finish(items[i], items[j], self.target):
+                        if self.accept(item := _make_item(*result)):
+                            yield item.expression
+                    continue
+                for result in _combine(items[i], items[j], self.integer_only):
+                    yield from self.solutions(rest + [_make_item(*result)])
+
+
+def iter_solutions(
+        numbers: list[number], target: number,
+        options: GameOptions,
+        limit: int | None = None,
+        timeout: float | None = None,
+) -> Iterator[Expression]:
+    if not numbers or not options.solvable():
+        return
+    deadline = time.perf_counter() + timeout if timeout is not None else None
+    search = _Search(target, options, deadline)
+    items = [_Item(value, NumberExpression(value), (_NUMBER, value), False) for value in sorted(numbers)]
+    for count, solution in enumerate(search.solutions(items), 1):
+        yield solution
+        if limit is not None and count >= limit:
+            return
+
+
+def count_solutions(
+        numbers: list[number], target: number,
+        options: GameOptions,
+        limit: int | None = None,
+        timeout: float | None = None,
+) -> int:
+    return sum(1 for _ in iter_solutions(numbers, target, options, limit, timeout))
+
+
+if __name__ == "__main__":
+    default_options = GameOptions.from_integer_solvable()
+    assert count_solutions([1, 1, 1, 1], 24, default_options) == 0
+    assert count_solutions([4, 4, 4, 4], 16, default_options) > 0
+    assert count_solutions([1, 3, 4, 6], 24, default_options) == 0
+    assert list(iter_solutions([1, 3, 4, 6], 24, GameOptions.from_float_only())) != []
+    assert count_solutions([1, 2, 3, 4, 5], 24, default_options, limit=10) == 10
+    for solution in iter_solutions([3, 3, 8, 8], 24, GameOptions.from_solvable()):
+        print(solution)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from math import gcd
+from typing import Callable, Hashable, Iterator
+
+from ..utils.expression import BinaryOperation, BiOpExpression, Expression, NumberExpression
+from ..utils.game_options import GameOptions
+from ..utils.types import number
+from . import bitmask
+from .arithmetic import Arithmetic, Rational
+from .operations import BackPointer, Value, build_expression, leaf_value, uses_rationals
+from .stats import SolverStats
+from .subsets import SubsetLayout, init_memo, record_exit, record_splits, results_getter, subset_results
+
+
+__all__ = ["find_solution_for_target"]
+
+
+_ADD = BinaryOperation.ADDITION
+_SUB = BinaryOperation.SUBTRACTION
+_MUL = BinaryOperation.MULTIPLICATION
+_DIV = BinaryOperation.DIVISION
+
+# (operation, whether the known value is the left operand, the other operand needed to reach the target)
+_Partner = tuple[BinaryOperation, bool, Value]
+
+
+def _integer_partners(value: int, target: int) -> Iterator[_Partner]:
+    yield _ADD, True, target - value
+    yield _SUB, True, value - target
+    yield _SUB, False, value + target
+    yield _DIV, False, target * value
+    if value != 0 and target % value == 0:
+        yield _MUL, True, target // value
+    if target != 0 and value % target == 0:
+        yield _DIV, True, value // target
+
+
+def _rational(numerator: int, denominator: int) -> Rational:
+    divisor = gcd(numerator, denominator)
+    if denominator < 0:
+        divisor = -divisor
+    return numerator // divisor, denominator // divisor
+
+
+def _rational_partners(value: Rational, target: Rational) -> Iterator[_Partner]:
+    num, den = value
+    target_num, target_den = target
+    yield _ADD, True, _rational(target_num * den - num * target_den, den * target_den)
+    yield _SUB, True, _rational(num * target_den - target_num * den, den * target_den)
+    yield _SUB, False, _rational(num * target_den + target_num * den, den * target_den)
+    yield _DIV, False, _rational(target_num * num, target_den * den)
+    if num != 0:
+        yield _MUL, True, _rational(target_num * den, target_den * num)
+    if target_num != 0:
+        yield _DIV, True, _rational(num * target_den, den * target_num)
+
+
+def _meet(
+        layout: SubsetLayout, memo: list[dict[Value, BackPointer] | None],
+        results_of: Callable[[Hashable], dict[Value, BackPointer]],
+        focused: int, other: int,
+        target: Value, rational: bool,
+        stats: SolverStats | None,
+) -> Expression | None:
+    if len(memo[focused]) > len(memo[other]):
+        focused, other = other, focused
+    known, lookup = memo[focused], memo[other]
+    partners = _rational_partners if rational else _integer_partners
+    zero = leaf_value(0, rational)
+    if stats is not None:
+        stats.splits_combined += 1
+        stats.value_pairs_combined += len(known)
+    for value in known:
+        if value == zero == target:
+            # 0 * y reaches a zero target for any y, which no single lookup can express
+            candidates: Iterator[_Partner] = iter([(_MUL, True, next(iter(lookup)))])
+        else:
+            candidates = partners(value, target)
+        for operation, known_left, partner in candidates:
+            if partner not in lookup:
+                continue
+            if operation is _DIV and (partner if known_left else value) == zero:
+                continue
+            known_expression = build_expression(results_of, layout.hands[focused], value)
+            partner_expression = build_expression(results_of, layout.hands[other], partner)
+            if known_left:
+                return BiOpExpression(operation, known_expression, partner_expression)
+            return BiOpExpression(operation, partner_expression, known_expression)
+    return None
+
+
+def find_solution_for_target(
+        numbers: list[number], target: number,
+        options: GameOptions,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
+        stats: SolverStats | None = None,
+) -> Expression | None:
+    rational = uses_rationals(options, arithmetic)
+    integer_only = options.integer_solvable()
+    if len(numbers) < 2 or not options.solvable() or not (rational or integer_only):
+        return bitmask.find_solution_for_target(numbers, target, options, arithmetic, stats)
+
+    if not options.must_use_all and target in numbers:
+        return NumberExpression(target)
+
+    layout = SubsetLayout(numbers)
+    memo = init_memo(layout, rational)
+    target_key = leaf_value(target, rational)
+    results_of = results_getter(layout, memo)
+
+    full_mask = layout.full_mask
+    full_splits_by_size = layout.splits_by_size(full_mask)
+    record_splits(stats, full_mask, sum(map(len, full_splits_by_size)))
+
+    for size in range(1, layout.size):
+        if size > 1:
+            for mask in layout.masks_by_size[size]:
+                results = memo[mask] = subset_results(layout, memo, mask, rational, integer_only, arithmetic, stats)
+                if not options.must_use_all and target_key in results:
+                    record_exit(stats, size, memo)
+                    return build_expression(results_of, layout.hands[mask], target_key)
+        for focused, other in full_splits_by_size[size]:
+            if (solution := _meet(layout, memo, results_of, focused, other, target_key, rational, stats)) is not None:
+                record_exit(stats, size, memo)
+                return solution
+    record_exit(stats, None, memo)
+    return None
+
+
+if __name__ == "__main__":
+    default_options = GameOptions.from_integer_solvable()
+    float_allowed_options = GameOptions.from_float_only()
+    assert find_solution_for_target([2, 10, 2, 2], 24, default_options) is not None
+    assert find_solution_for_target([1, 3, 4, 6], 24, default_options) is None
+    assert find_solution_for_target([1, 3, 4, 6], 24, float_allowed_options) is not None
+    assert find_solution_for_target([3, 3, 8, 8], 24, float_allowed_options) is not None
+    assert find_solution_for_target([1, 7, 13, 37], 1, GameOptions(must_use_all=False)) is not None
+    assert find_solution_for_target([5, 5, 5, 5], 0, default_options) is not None
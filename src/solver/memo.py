@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Self
+
+from ..utils.types import number
+from .operations import BackPointer, Value
+
+
+__all__ = ["ReachableMemo", "combine_memo_stats", "get_reachable_memo"]
+
+
+# (rational, integer only), sorted sub-multiset
+MemoKey = tuple[tuple[bool, bool], tuple[number, ...]]
+Results = dict[Value, BackPointer]
+
+
+def _size_of(results: Results) -> int:
+    return sys.getsizeof(results) + sum(
+        sys.getsizeof(value) + sys.getsizeof(back_pointer) for value, back_pointer in results.items()
+    )
+
+
+class ReachableMemo:
+    def __init__(self, max_values: int) -> None:
+        self.max_values = max_values
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[MemoKey, tuple[Results, int]] = OrderedDict()
+        self._values = 0
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+
+    def get(self, key: MemoKey) -> Results | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: MemoKey, results: Results) -> None:
+        if len(results) > self.max_values:
+            return
+        size = _size_of(results)
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (results, size)
+            self._values += len(results)
+            self._bytes += size
+            while self._values > self.max_values:
+                _, (evicted, evicted_size) = self._entries.popitem(last=False)
+                self._values -= len(evicted)
+                self._bytes -= evicted_size
+                self._evicted += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._values = 0
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evicted = 0
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "subsets": len(self._entries),
+                "values": self._values,
+                "max_values": self.max_values,
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evicted": self._evicted,
+            }
+
+    @classmethod
+    def from_env(cls) -> Self:
+        return cls(max_values=int(os.environ.get("REACHABLE_MEMO_SIZE") or 250_000))
+
+
+def combine_memo_stats(stats: list[dict[str, int | float]]) -> dict[str, int | float]:
+    combined = {
+        key: sum(memo[key] for memo in stats)
+        for key in ("subsets", "values", "max_values", "bytes", "hits", "misses", "evicted")
+    }
+    lookups = combined["hits"] + combined["misses"]
+    combined["hit_rate"] = combined["hits"] / lookups if lookups else 0.0
+    return combined
+
+
+_memo: ReachableMemo | None = None
+_memo_lock = threading.Lock()
+
+
+def get_reachable_memo() -> ReachableMemo:
+    global _memo
+    if _memo is None:
+        with _memo_lock:
+            if _memo is None:
+                _memo = ReachableMemo.from_env()
+    return _memo
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from math import gcd
+from typing import Callable, Hashable
+
+from ..utils.expression import BinaryOperation, BiOpExpression, Expression, NumberExpression
+from ..utils.game_options import GameOptions
+from ..utils.types import number
+from .arithmetic import Arithmetic, Rational, to_rational
+
+
+__all__ = [
+    "BackPointer",
+    "Value",
+    "binary_operation",
+    "build_expression",
+    "leaf_value",
+    "uses_rationals",
+]
+
+
+Value = number | Rational
+BackPointer = tuple[tuple[Hashable, Hashable], BinaryOperation, Value, Value] | NumberExpression
+
+_ADD = BinaryOperation.ADDITION
+_SUB = BinaryOperation.SUBTRACTION
+_MUL = BinaryOperation.MULTIPLICATION
+_DIV = BinaryOperation.DIVISION
+
+_RATIONAL_ZERO = (0, 1)
+_RATIONAL_ONE = (1, 1)
+
+
+def uses_rationals(options: GameOptions, arithmetic: Arithmetic) -> bool:
+    return not options.integer_solvable() and arithmetic is Arithmetic.EXACT
+
+
+def leaf_value(number: number, rational: bool) -> Value:
+    return to_rational(number) if rational else number
+
+
+def _divide(
+        a_val: number, b_val: number, pair: tuple[Hashable, Hashable],
+        results: dict[number, BackPointer], integer_only: bool,
+) -> None:
+    if b_val == 0:
+        return
+    if integer_only:
+        div, mod = divmod(a_val, b_val)
+        if mod == 0:
+            results[div] = (pair, _DIV, a_val, b_val)
+    else:
+        results[a_val / b_val] = (pair, _DIV, a_val, b_val)
+
+
+def _rational_divide(
+        a_num: int, b_num: int, a_val: Rational, b_val: Rational, pair: tuple[Hashable, Hashable],
+        results: dict[Rational, BackPointer],
+) -> None:
+    if b_num == 0:
+        return
+    divisor = gcd(a_num, b_num)
+    if b_num < 0:
+        divisor = -divisor
+    results[(a_num // divisor, b_num // divisor)] = (pair, _DIV, a_val, b_val)
+
+
+def _operands(values: dict[Value, BackPointer], zero: Value, one: Value) -> tuple[list[Value], list[Value]]:
+    identities = [identity for identity in (zero, one) if identity in values]
+    if not identities:
+        return list(values), identities
+    return [value for value in values if value != zero and value != one], identities
+
+
+def _expanded_pairs(a_values: list[Value], b_values: list[Value], symmetric: bool) -> int:
+    if symmetric:
+        return len(a_values) * (len(a_values) + 1) // 2
+    return len(a_values) * len(b_values)
+
+
+def _identity_operation(
+        values: dict[Value, BackPointer], identity: number,
+        results: dict[number, BackPointer],
+        pair: tuple[Hashable, Hashable], reversed_pair: tuple[Hashable, Hashable],
+        integer_only: bool,
+) -> None:
+    if identity == 0:
+        for value in values:
+            results[value] = (pair, _ADD, value, identity)
+            results[-value] = (reversed_pair, _SUB, identity, value)
+            results[identity] = (pair, _MUL, value, identity)
+        return
+    for value in values:
+        results[value + identity] = (pair, _ADD, value, identity)
+        results[value - identity] = (pair, _SUB, value, identity)
+        results[identity - value] = (reversed_pair, _SUB, identity, value)
+        results[value] = (pair, _MUL, value, identity)
+        _divide(identity, value, reversed_pair, results, integer_only)
+
+
+def _rational_identity_operation(
+        values: dict[Rational, BackPointer], identity: Rational,
+        results: dict[Rational, BackPointer],
+        pair: tuple[Hashable, Hashable], reversed_pair: tuple[Hashable, Hashable],
+) -> None:
+    if identity[0] == 0:
+        for value in values:
+            results[value] = (pair, _ADD, value, identity)
+            results[(-value[0], value[1])] = (reversed_pair, _SUB, identity, value)
+            results[identity] = (pair, _MUL, value, identity)
+        return
+    for value in values:
+        num, den = value
+        results[(num + den, den)] = (pair, _ADD, value, identity)
+        results[(num - den, den)] = (pair, _SUB, value, identity)
+        results[(den - num, den)] = (reversed_pair, _SUB, identity, value)
+        results[value] = (pair, _MUL, value, identity)
+        if num > 0:
+            results[(den, num)] = (reversed_pair, _DIV, identity, value)
+        elif num < 0:
+            results[(-den, -num)] = (reversed_pair, _DIV, identity, value)
+
+
+def _rational_binary_operation(
+        a: dict[Rational, BackPointer], b: dict[Rational, BackPointer],
+        results: dict[Rational, BackPointer],
+        pair: tuple[Hashable, Hashable], reversed_pair: tuple[Hashable, Hashable],
+) -> int:
+    symmetric = pair[0] == pair[1]
+    a_values, a_identities = _operands(a, _RATIONAL_ZERO, _RATIONAL_ONE)
+    b_values, b_identities = (a_values, a_identities) if symmetric else _operands(b, _RATIONAL_ZERO, _RATIONAL_ONE)
+    for index, a_val in enumerate(a_values):
+        a_num, a_den = a_val
+        if symmetric:
+            divisor = gcd(2 * a_num, a_den)
+            results[(2 * a_num // divisor, a_den // divisor)] = (pair, _ADD, a_val, a_val)
+            results[_RATIONAL_ZERO] = (pair, _SUB, a_val, a_val)
+            results[(a_num * a_num, a_den * a_den)] = (pair, _MUL, a_val, a_val)
+            results[_RATIONAL_ONE] = (pair, _DIV, a_val, a_val)
+            b_values = a_values[index + 1:]
+        for b_val in b_values:
+            b_num, b_den = b_val
+            if a_den == 1 and b_den == 1:
+                results[(a_num + b_num, 1)] = (pair, _ADD, a_val, b_val)
+                results[(a_num - b_num, 1)] = (pair, _SUB, a_val, b_val)
+                results[(b_num - a_num, 1)] = (reversed_pair, _SUB, b_val, a_val)
+                results[(a_num * b_num, 1)] = (pair, _MUL, a_val, b_val)
+                _rational_divide(a_num, b_num, a_val, b_val, pair, results)
+                _rational_divide(b_num, a_num, b_val, a_val, reversed_pair, results)
+                continue
+            a_scaled = a_num * b_den
+            b_scaled = b_num * a_den
+            denominator = a_den * b_den
+            total = a_scaled + b_scaled
+            divisor = gcd(total, denominator)
+            results[(total // divisor, denominator // divisor)] = (pair, _ADD, a_val, b_val)
+            difference = a_scaled - b_scaled
+            divisor = gcd(difference, denominator)
+            results[(difference // divisor, denominator // divisor)] = (pair, _SUB, a_val, b_val)
+            results[(-difference // divisor, denominator // divisor)] = (reversed_pair, _SUB, b_val, a_val)
+            product = a_num * b_num
+            divisor = gcd(product, denominator)
+            results[(product // divisor, denominator // divisor)] = (pair, _MUL, a_val, b_val)
+            _rational_divide(a_scaled, b_scaled, a_val, b_val, pair, results)
+            _rational_divide(b_scaled, a_scaled, b_val, a_val, reversed_pair, results)
+    for identity in b_identities:
+        _rational_identity_operation(a, identity, results, pair, reversed_pair)
+    if not symmetric:
+        for identity in a_identities:
+            _rational_identity_operation(b, identity, results, reversed_pair, pair)
+    return _expanded_pairs(a_values, b_values, symmetric)
+
+
+def binary_operation(
+        a: dict[Value, BackPointer], b: dict[Value, BackPointer],
+        results: dict[Value, BackPointer],
+        a_key: Hashable, b_key: Hashable,
+        integer_only: bool = True,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
+) -> int:
+    pair = (a_key, b_key)
+    reversed_pair = (b_key, a_key)
+    if not integer_only and arithmetic is Arithmetic.EXACT:
+        return _rational_binary_operation(a, b, results, pair, reversed_pair)
+    symmetric = a_key == b_key
+    a_values, a_identities = _operands(a, 0, 1)
+    b_values, b_identities = (a_values, a_identities) if symmetric else _operands(b, 0, 1)
+    for index, a_val in enumerate(a_values):
+        if symmetric:
+            results[a_val + a_val] = (pair, _ADD, a_val, a_val)
+            results[0] = (pair, _SUB, a_val, a_val)
+            results[a_val * a_val] = (pair, _MUL, a_val, a_val)
+            results[1] = (pair, _DIV, a_val, a_val)
+            b_values = a_values[index + 1:]
+        for b_val in b_values:
+            results[a_val + b_val] = (pair, _ADD, a_val, b_val)
+            results[a_val - b_val] = (pair, _SUB, a_val, b_val)
+            results[b_val - a_val] = (reversed_pair, _SUB, b_val, a_val)
+            results[a_val * b_val] = (pair, _MUL, a_val, b_val)
+            _divide(a_val, b_val, pair, results, integer_only)
+            _divide(b_val, a_val, reversed_pair, results, integer_only)
+    for identity in b_identities:
+        _identity_operation(a, identity, results, pair, reversed_pair, integer_only)
+    if not symmetric:
+        for identity in a_identities:
+            _identity_operation(b, identity, results, reversed_pair, pair, integer_only)
+    return _expanded_pairs(a_values, b_values, symmetric)
+
+
+def build_expression(
+        results_of: Callable[[Hashable], dict[Value, BackPointer]],
+        key: Hashable, value: Value,
+) -> Expression:
+    back_pointer = results_of(key)[value]
+    if isinstance(back_pointer, NumberExpression):
+        return back_pointer
+    (left_key, right_key), operation, left_value, right_value = back_pointer
+    return BiOpExpression(
+        operation,
+        build_expression(results_of, left_key, left_value),
+        build_expression(results_of, right_key, right_value),
+    )
@@ -1,14 +1,57 @@
+from enum import Enum
+
 from ..utils.expression import Expression
 from ..utils.game_options import GameOptions
-from .algorithm import find_solution_for_target
+from . import algorithm, bitmask, meet_in_the_middle
+from .stats import SolverStats
+
+
+__all__ = ["MEET_IN_THE_MIDDLE_MIN_SIZE", "SolverEngine", "find_integer_and_float_solutions", "find_one_solution"]
+
+
+class SolverEngine(Enum):
+    VECTOR = "vector"
+    BITMASK = "bitmask"
+    MEET_IN_THE_MIDDLE = "meet_in_the_middle"
+
+
+MEET_IN_THE_MIDDLE_MIN_SIZE = 4
 
+_FIND_SOLUTION = {
+    SolverEngine.VECTOR: algorithm.find_solution_for_target,
+    SolverEngine.BITMASK: bitmask.find_solution_for_target,
+    SolverEngine.MEET_IN_THE_MIDDLE: meet_in_the_middle.find_solution_for_target,
+}
 
-__all__ = ["find_one_solution"]
+
+def _pick_engine(numbers: list[int]) -> SolverEngine:
+    if len(numbers) >= MEET_IN_THE_MIDDLE_MIN_SIZE:
+        return SolverEngine.MEET_IN_THE_MIDDLE
+    return SolverEngine.BITMASK
 
 
 def find_one_solution(
     numbers: list[int],
     target: int,
     options: GameOptions,
+    engine: SolverEngine | None = None,
+    stats: SolverStats | None = None,
 ) -> Expression | None:
-    return find_solution_for_target(numbers, target, options)
+    engine = engine or _pick_engine(numbers)
+    if engine is SolverEngine.VECTOR:
+        return algorithm.find_solution_for_target(numbers, target, options)
+    return _FIND_SOLUTION[engine](numbers, target, options, stats=stats)
+
+
+def find_integer_and_float_solutions(
+    numbers: list[int],
+    target: int,
+    options: GameOptions,
+    engine: SolverEngine | None = None,
+    stats: SolverStats | None = None,
+) -> tuple[Expression | None, Expression | None]:
+    # the integer pass settles most hands, and is much cheaper than the rational pass it skips
+    int_solution = find_one_solution(numbers, target, options.as_integer_solvable(), engine, stats)
+    if int_solution is not None:
+        return int_solution, int_solution
+    return None, find_one_solution(numbers, target, options.as_float_only(), engine, stats)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Self
+
+
+__all__ = ["SolverStats", "collect_stats"]
+
+
+@dataclass
+class SolverStats:
+    subsets_visited: int = 0
+    splits_combined: int = 0
+    value_pairs_combined: int = 0
+    splits_pruned: int = 0
+    value_pairs_pruned: int = 0
+    subsets_cached: int = 0
+    memo_sizes: dict[int, int] = field(default_factory=dict)
+    early_exit_size: int | None = None
+    elapsed: float = 0.0
+
+    def record_level(self, size: int, memo_size: int) -> None:
+        self.memo_sizes[size] = self.memo_sizes.get(size, 0) + memo_size
+
+    def merge(self, other: Self) -> None:
+        self.subsets_visited += other.subsets_visited
+        self.splits_combined += other.splits_combined
+        self.value_pairs_combined += other.value_pairs_combined
+        self.splits_pruned += other.splits_pruned
+        self.value_pairs_pruned += other.value_pairs_pruned
+        self.subsets_cached += other.subsets_cached
+        for size, memo_size in other.memo_sizes.items():
+            self.record_level(size, memo_size)
+        if other.early_exit_size is not None:
+            self.early_exit_size = other.early_exit_size
+        self.elapsed += other.elapsed
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def collect_stats(fn: Callable[..., Any], stats: Any, *args: Any) -> tuple[Any, Any]:
+    start_time = time.perf_counter()
+    result = fn(*args, stats=stats)
+    stats.elapsed += time.perf_counter() - start_time
+    return result, stats
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import Callable, Hashable
+
+from ..utils.expression import NumberExpression
+from ..utils.types import number
+from .arithmetic import Arithmetic
+from .memo import get_reachable_memo
+from .operations import BackPointer, Value, binary_operation, leaf_value
+from .stats import SolverStats
+
+
+__all__ = [
+    "SubsetLayout", "init_memo", "record_exit", "record_split", "record_splits", "results_getter", "subset_results",
+]
+
+
+class SubsetLayout:
+    def __init__(self, numbers: list[number]) -> None:
+        self.numbers = sorted(numbers)
+        self.size = len(self.numbers)
+        self.full_mask = (1 << self.size) - 1
+
+        runs: list[tuple[int, int]] = []
+        for index, value in enumerate(self.numbers):
+            if index > 0 and value == self.numbers[index - 1]:
+                start, _ = runs[-1]
+                runs[-1] = (start, index - start + 1)
+            else:
+                runs.append((index, 1))
+        run_masks = [(start, ((1 << length) - 1) << start) for start, length in runs]
+
+        self.canonical = [0] * (self.full_mask + 1)
+        for mask in range(self.full_mask + 1):
+            canonical_mask = 0
+            for start, run_mask in run_masks:
+                canonical_mask |= ((1 << (mask & run_mask).bit_count()) - 1) << start
+            self.canonical[mask] = canonical_mask
+
+        self.masks_by_size: list[list[int]] = [[] for _ in range(self.size + 1)]
+        self.hands: list[tuple[number, ...]] = [()] * (self.full_mask + 1)
+        self.masks: dict[tuple[number, ...], int] = {}
+        for mask in range(1, self.full_mask + 1):
+            if self.canonical[mask] == mask:
+                self.masks_by_size[mask.bit_count()].append(mask)
+                hand = self.hands[mask] = tuple(value for index, value in enumerate(self.numbers) if mask >> index & 1)
+                self.masks[hand] = mask
+
+    def splits_by_size(self, mask: int) -> list[list[tuple[int, int]]]:
+        # grouped by the larger half, so a split is tried as soon as both of its halves are known
+        by_size: list[list[tuple[int, int]]] = [[] for _ in range(mask.bit_count())]
+        for focused, other in self.splits(mask):
+            by_size[max(focused.bit_count(), other.bit_count())].append((focused, other))
+        return by_size
+
+    def splits(self, mask: int) -> list[tuple[int, int]]:
+        canonical = self.canonical
+        lowest_bit = mask & -mask
+        rest_bits = mask ^ lowest_bit
+        seen: set[tuple[int, int]] = set()
+        splits: list[tuple[int, int]] = []
+        sub = rest_bits
+        while True:
+            focused = sub | lowest_bit
+            if focused != mask:
+                focused_canonical = canonical[focused]
+                other_canonical = canonical[mask ^ focused]
+                key = (
+                    (focused_canonical, other_canonical)
+                    if focused_canonical <= other_canonical
+                    else (other_canonical, focused_canonical)
+                )
+                if key not in seen:
+                    seen.add(key)
+                    splits.append((focused_canonical, other_canonical))
+            if sub == 0:
+                break
+            sub = (sub - 1) & rest_bits
+        return splits
+
+
+def init_memo(layout: SubsetLayout, rational: bool) -> list[dict[Value, BackPointer] | None]:
+    memo: list[dict[Value, BackPointer] | None] = [None] * (layout.full_mask + 1)
+    for mask in layout.masks_by_size[1]:
+        value = layout.numbers[mask.bit_length() - 1]
+        memo[mask] = {leaf_value(value, rational): NumberExpression(value)}
+    return memo
+
+
+def results_getter(
+        layout: SubsetLayout, memo: list[dict[Value, BackPointer] | None],
+) -> Callable[[Hashable], dict[Value, BackPointer]]:
+    return lambda hand: memo[layout.masks[hand]]
+
+
+def subset_results(
+        layout: SubsetLayout, memo: list[dict[Value, BackPointer] | None], mask: int,
+        rational: bool, integer_only: bool, arithmetic: Arithmetic,
+        stats: SolverStats | None,
+) -> dict[Value, BackPointer]:
+    key = ((rational, integer_only), layout.hands[mask])
+    reachable = get_reachable_memo()
+    if (results := reachable.get(key)) is not None:
+        if stats is not None:
+            stats.subsets_cached += 1
+        return results
+    results = {}
+    splits = layout.splits(mask)
+    record_splits(stats, mask, len(splits))
+    hands = layout.hands
+    for focused, other in splits:
+        expanded = binary_operation(
+            memo[focused], memo[other], results, hands[focused], hands[other], integer_only, arithmetic
+        )
+        record_split(stats, memo[focused], memo[other], expanded)
+    reachable.put(key, results)
+    return results
+
+
+def record_splits(stats: SolverStats | None, mask: int, split_count: int) -> None:
+    if stats is not None:
+        stats.splits_pruned += (1 << mask.bit_count()) - 2 - split_count
+
+
+def record_split(
+        stats: SolverStats | None, a: dict[Value, BackPointer], b: dict[Value, BackPointer], expanded: int,
+) -> None:
+    if stats is None:
+        return
+    stats.splits_combined += 1
+    stats.value_pairs_combined += expanded
+    stats.value_pairs_pruned += len(a) * len(b) - expanded
+
+
+def record_exit(
+        stats: SolverStats | None, exit_size: int | None, *memos: list[dict[Value, BackPointer] | None],
+) -> None:
+    if stats is None:
+        return
+    stats.early_exit_size = exit_size
+    for memo in memos:
+        for mask, results in enumerate(memo):
+            if results:
+                stats.subsets_visited += 1
+                stats.record_level(mask.bit_count(), len(results))
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..utils.expression import BinaryOperation, BiOpExpression, Expression, NumberExpression
+from ..utils.game_options import GameOptions
+from ..utils.types import number
+from .arithmetic import Arithmetic, from_rational, to_rational
+from .operations import uses_rationals
+from .subsets import SubsetLayout
+
+
+__all__ = ["ReachableValues", "all_results", "reachable_values"]
+
+
+_OPERATIONS = (
+    (BinaryOperation.ADDITION, False),
+    (BinaryOperation.SUBTRACTION, False),
+    (BinaryOperation.SUBTRACTION, True),
+    (BinaryOperation.MULTIPLICATION, False),
+    (BinaryOperation.DIVISION, False),
+    (BinaryOperation.DIVISION, True),
+)
+_LEAF = -1
+_INT_LIMIT = 1 << 62
+
+Candidate = tuple[np.ndarray, np.ndarray | None]
+
+
+@dataclass
+class _Table:
+    values: np.ndarray
+    split: np.ndarray
+    operation: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    if values.ndim == 1:
+        _, index = np.unique(values, return_index=True)
+        return index
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    scale = int(values[:, 1].max()) + 1
+    if int(np.abs(values[:, 0]).max() + 1) * scale < _INT_LIMIT:
+        return _unique(values[:, 0] * scale + values[:, 1])
+    order = np.lexsort((values[:, 1], values[:, 0]))
+    ordered = values[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    return order[keep]
+
+
+def _concat(tables: list[_Table]) -> _Table:
+    table = _Table(*(np.concatenate(columns) for columns in zip(*(
+        (table.values, table.split, table.operation, table.left, table.right)
+        for table in tables
+    ))))
+    return _take(table, _unique(table.values))
+
+
+def _take(table: _Table, index: np.ndarray) -> _Table:
+    return _Table(
+        table.values[index], table.split[index], table.operation[index], table.left[index], table.right[index]
+    )
+
+
+def _scalar_candidates(a: np.ndarray, b: np.ndarray, integer_only: bool) -> list[Candidate]:
+    a, b = np.broadcast_arrays(a[:, None], b[None, :])
+    candidates: list[Candidate] = [(a + b, None), (a - b, None), (b - a, None), (a * b, None)]
+    for dividend, divisor in ((a, b), (b, a)):
+        valid = divisor != 0
+        safe_divisor = np.where(valid, divisor, 1)
+        if integer_only:
+            quotient, remainder = np.divmod(dividend, safe_divisor)
+            valid &= remainder == 0
+        else:
+            quotient = dividend / safe_divisor
+        candidates.append((quotient, valid))
+    return candidates
+
+
+def _reduce(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    divisor = np.gcd(numerator, denominator)
+    divisor[divisor == 0] = 1
+    divisor[denominator < 0] *= -1
+    return np.stack([numerator // divisor, denominator // divisor], axis=-1)
+
+
+def _rational_candidates(a: np.ndarray, b: np.ndarray) -> list[Candidate]:
+    a_num, b_num = np.broadcast_arrays(a[:, None, 0], b[None, :, 0])
+    a_den, b_den = np.broadcast_arrays(a[:, None, 1], b[None, :, 1])
+    a_scaled = a_num * b_den
+    b_scaled = b_num * a_den
+    denominator = a_den * b_den
+    return [
+        (_reduce(a_scaled + b_scaled, denominator), None),
+        (_reduce(a_scaled - b_scaled, denominator), None),
+        (_reduce(b_scaled - a_scaled, denominator), None),
+        (_reduce(a_num * b_num, denominator), None),
+        (_reduce(a_scaled, b_scaled), b_num != 0),
+        (_reduce(b_scaled, a_scaled), a_num != 0),
+    ]
+
+
+def _combine(a: _Table, b: _Table, split: int, rational: bool, integer_only: bool) -> _Table:
+    candidates = (
+        _rational_candidates(a.values, b.values)
+        if rational
+        else _scalar_candidates(a.values, b.values, integer_only)
+    )
+    pairs = np.arange(len(a) * len(b))
+    left = pairs // len(b)
+    right = pairs % len(b)
+    tables = []
+    for operation, (values, valid) in enumerate(candidates):
+        values = values.reshape(len(pairs), -1) if rational else values.ravel()
+        if valid is None:
+            table = _Table(values, np.full(len(pairs), split), np.full(len(pairs), operation), left, right)
+        else:
+            valid = valid.ravel()
+            count = np.count_nonzero(valid)
+            table = _Table(
+                values[valid], np.full(count, split), np.full(count, operation), left[valid], right[valid]
+            )
+        tables.append(_take(table, _unique(table.values)))
+    return _concat(tables)
+
+
+def _leaf(value: number, rational: bool, integer_only: bool) -> _Table:
+    if rational:
+        values = np.array([to_rational(value)], dtype=np.int64)
+    else:
+        values = np.array([value], dtype=np.int64 if integer_only else np.float64)
+    empty = np.zeros(1, dtype=np.int64)
+    return _Table(values, np.full(1, _LEAF), empty, empty, empty)
+
+
+def _check_bounds(numbers: list[number]) -> None:
+    bound = 1 << (len(numbers) - 1)
+    for value in numbers:
+        bound *= max(abs(int(value)), 1)
+    if bound >= _INT_LIMIT:
+        raise OverflowError(f"{numbers} may reach values outside the 64-bit integer range")
+
+
+class ReachableValues:
+    def __init__(
+            self, layout: SubsetLayout, tables: list[_Table | None], splits: list[list[tuple[int, int]]],
+            masks: np.ndarray, rows: np.ndarray, values: np.ndarray, rational: bool,
+    ) -> None:
+        self._layout = layout
+        self._tables = tables
+        self._splits = splits
+        self._masks = masks
+        self._rows = rows
+        self._values = values
+        self._rational = rational
+        self._positions: dict[number, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: number) -> bool:
+        return value in self.positions()
+
+    def array(self) -> np.ndarray:
+        return self._values
+
+    def values(self) -> list[number]:
+        if self._rational:
+            return [from_rational(value) for value in map(tuple, self._values.tolist())]
+        return self._values.tolist()
+
+    def positions(self) -> dict[number, int]:
+        if self._positions is None:
+            self._positions = {value: position for position, value in enumerate(self.values())}
+        return self._positions
+
+    def expression(self, value: number) -> Expression | None:
+        position = self.positions().get(value)
+        if position is None:
+            return None
+        return self._build(int(self._masks[position]), int(self._rows[position]))
+
+    def expressions(self) -> dict[number, Expression]:
+        return {
+            value: self._build(int(mask), int(row))
+            for value, mask, row in zip(self.values(), self._masks, self._rows)
+        }
+
+    def _build(self, mask: int, row: int) -> Expression:
+        table = self._tables[mask]
+        split = int(table.split[row])
+        if split == _LEAF:
+            return NumberExpression(self._layout.numbers[mask.bit_length() - 1])
+        focused, other = self._splits[mask][split]
+        operation, reverse = _OPERATIONS[table.operation[row]]
+        left = self._build(focused, int(table.left[row]))
+        right = self._build(other, int(table.right[row]))
+        if reverse:
+            left, right = right, left
+        return BiOpExpression(operation, left, right)
+
+
+def reachable_values(
+        numbers: list[number], options: GameOptions,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
+) -> ReachableValues:
+    rational = uses_rationals(options, arithmetic)
+    integer_only = options.integer_solvable()
+    if numbers and (rational or integer_only):
+        _check_bounds(numbers)
+
+    layout = SubsetLayout(numbers)
+    tables: list[_Table | None] = [None] * (layout.full_mask + 1)
+    splits: list[list[tuple[int, int]]] = [[] for _ in range(layout.full_mask + 1)]
+    for mask in layout.masks_by_size[1] if numbers else []:
+        tables[mask] = _leaf(layout.numbers[mask.bit_length() - 1], rational, integer_only)
+
+    if options.solvable():
+        for size in range(2, layout.size + 1):
+            for mask in layout.masks_by_size[size]:
+                splits[mask] = layout.splits(mask)
+                tables[mask] = _concat([
+                    _combine(tables[focused], tables[other], index, rational, integer_only)
+                    for index, (focused, other) in enumerate(splits[mask])
+                ])
+
+    if layout.size == 0:
+        masks = []
+    elif not options.solvable() and layout.size > 1:
+        masks = [] if options.must_use_all else layout.masks_by_size[1]
+    elif options.must_use_all:
+        masks = [layout.full_mask]
+    else:
+        masks = [mask for masks in layout.masks_by_size for mask in masks]
+
+    if not masks:
+        empty = np.zeros(0, dtype=np.int64)
+        values = np.zeros((0, 2) if rational else 0, dtype=np.int64 if rational or integer_only else np.float64)
+        return ReachableValues(layout, tables, splits, empty, empty, values, rational)
+    values = np.concatenate([tables[mask].values for mask in masks])
+    all_masks = np.concatenate([np.full(len(tables[mask]), mask) for mask in masks])
+    all_rows = np.concatenate([np.arange(len(tables[mask])) for mask in masks])
+    index = _unique(values)
+    return ReachableValues(layout, tables, splits, all_masks[index], all_rows[index], values[index], rational)
+
+
+def all_results(
+        numbers: list[number], options: GameOptions,
+        arithmetic: Arithmetic = Arithmetic.EXACT,
+) -> dict[number, Expression]:
+    return reachable_values(numbers, options, arithmetic).expressions()
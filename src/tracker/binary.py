@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+from dataclasses import dataclass
+
+from ..utils.game_options import Difficulty, GameOptions
+
+
+__all__ = [
+    "MAX_PACKED_NUMBERS",
+    "RECORD",
+    "BinaryRecord",
+    "hash_ip",
+    "pack_options",
+    "pack_record",
+    "unpack_options",
+]
+
+
+MAX_PACKED_NUMBERS = 8
+
+# timestamp, ip hash, target, quantity, numbers, options bitfield
+RECORD = struct.Struct(f"<dQiB{MAX_PACKED_NUMBERS}sB")
+
+_ALLOW_INTEGER = 1
+_ALLOW_FLOAT_ONLY = 2
+_MUST_USE_ALL = 4
+_DIFFICULTY_SHIFT = 3
+_DIFFICULTIES = list(Difficulty)
+
+
+def hash_ip(client_ip: str | None) -> int:
+    digest = hashlib.blake2b((client_ip or "").encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def pack_options(options: GameOptions) -> int:
+    return (
+        (_ALLOW_INTEGER if options.allow_integer else 0)
+        | (_ALLOW_FLOAT_ONLY if options.allow_float_only else 0)
+        | (_MUST_USE_ALL if options.must_use_all else 0)
+        | (
+            _DIFFICULTIES.index(options.difficulty) + 1 << _DIFFICULTY_SHIFT
+            if options.difficulty is not None
+            else 0
+        )
+    )
+
+
+def unpack_options(bits: int) -> GameOptions:
+    return GameOptions(
+        allow_integer=bool(bits & _ALLOW_INTEGER),
+        allow_float_only=bool(bits & _ALLOW_FLOAT_ONLY),
+        must_use_all=bool(bits & _MUST_USE_ALL),
+        difficulty=_DIFFICULTIES[difficulty - 1] if (difficulty := bits >> _DIFFICULTY_SHIFT) else None,
+    )
+
+
+def pack_record(
+        timestamp: float, client_ip: str | None, target: int, numbers: list[int], options: GameOptions,
+) -> bytes:
+    packed_numbers = bytes(min(max(number, 0), 255) for number in numbers[:MAX_PACKED_NUMBERS])
+    return RECORD.pack(timestamp, hash_ip(client_ip), target, len(numbers), packed_numbers, pack_options(options))
+
+
+@dataclass(frozen=True)
+class BinaryRecord:
+    timestamp: float
+    ip_hash: int
+    target: int
+    numbers: tuple[int, ...]
+    options: GameOptions
+
+    @classmethod
+    def unpack(cls, fields: tuple[float, int, int, int, bytes, int]) -> BinaryRecord:
+        timestamp, ip_hash, target, quantity, packed_numbers, option_bits = fields
+        return cls(
+            timestamp=timestamp,
+            ip_hash=ip_hash,
+            target=target,
+            numbers=tuple(packed_numbers[:min(quantity, MAX_PACKED_NUMBERS)]),
+            options=unpack_options(option_bits),
+        )
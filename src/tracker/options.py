@@ -1,9 +1,19 @@
 from dataclasses import dataclass
+from enum import Enum
 
 
-__all__ = ["TrackerOptions"]
+__all__ = ["LogFormat", "TrackerOptions"]
+
+
+class LogFormat(Enum):
+    TEXT = "text"
+    BINARY = "binary"
 
 
 @dataclass(frozen=True)
 class TrackerOptions:
-    ...
+    log_dir: str = "logs"
+    log_format: LogFormat = LogFormat.TEXT
+    queue_size: int = 10000
+    batch_size: int = 256
+    flush_interval: float = 1.0
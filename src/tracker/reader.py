@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import datetime
+import mmap
+import os
+from collections import Counter
+from typing import Iterator
+
+from .binary import MAX_PACKED_NUMBERS, RECORD, unpack_options
+
+
+__all__ = ["BinaryLog"]
+
+
+class BinaryLog:
+    def __init__(self, paths: list[str]) -> None:
+        self._paths = paths
+
+    def __len__(self) -> int:
+        return sum(os.path.getsize(path) // RECORD.size for path in self._paths)
+
+    def iter_fields(self) -> Iterator[tuple[float, int, int, int, bytes, int]]:
+        for path in self._paths:
+            if (size := os.path.getsize(path) // RECORD.size * RECORD.size) == 0:
+                continue
+            with open(path, "rb") as fd, mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped)[:size] as view:
+                    records = RECORD.iter_unpack(view)
+                    try:
+                        yield from records
+                    finally:
+                        del records
+
+    def games_per_hand(self) -> Counter[tuple[int, ...]]:
+        return Counter(
+            tuple(sorted(packed_numbers[:min(quantity, MAX_PACKED_NUMBERS)]))
+            for _, _, _, quantity, packed_numbers, _ in self.iter_fields()
+        )
+
+    def games_per_options(self) -> Counter[str]:
+        bits_counter = Counter(option_bits for *_, option_bits in self.iter_fields())
+        return Counter({
+            str(unpack_options(bits).to_dict()): count
+            for bits, count in bits_counter.items()
+        })
+
+    def games_per_hour(self) -> Counter[str]:
+        hours_counter = Counter(int(timestamp // 3600) for timestamp, *_ in self.iter_fields())
+        return Counter({
+            datetime.datetime.fromtimestamp(hour * 3600, datetime.timezone.utc).strftime("%Y-%m-%d %H:00"): count
+            for hour, count in hours_counter.items()
+        })
+
+    def games_per_target(self) -> Counter[int]:
+        return Counter(target for _, _, target, *_ in self.iter_fields())
+
+    def unique_clients(self) -> int:
+        return len({ip_hash for _, ip_hash, *_ in self.iter_fields()})
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aggregate binary tracker logs.")
+    parser.add_argument("paths", nargs="+", help="daily .bin files written with LogFormat.BINARY")
+    parser.add_argument("--by", choices=["hand", "options", "hour", "target"], default="hand")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    log = BinaryLog(args.paths)
+    counter = {
+        "hand": log.games_per_hand,
+        "options": log.games_per_options,
+        "hour": log.games_per_hour,
+        "target": log.games_per_target,
+    }[args.by]()
+    print(f"{len(log)} records, {log.unique_clients()} unique clients")
+    rows = sorted(counter.items()) if args.by == "hour" else counter.most_common(args.top)
+    for key, count in rows:
+        print(f"{count:>10}\t{key}")
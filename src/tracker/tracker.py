@@ -1,44 +1,147 @@
 from __future__ import annotations
 
 import _io
+import atexit
 import datetime
+import logging
 import os
-
-import flask as flk
+import queue
+import threading
+import time
 
 from ..models import GameModel
-from .options import TrackerOptions
+from .binary import pack_record
+from .options import LogFormat, TrackerOptions
 
 __all__ = ["Tracker"]
 
 
+_logger = logging.getLogger(__name__)
+
+_Record = tuple[str, datetime.datetime, GameModel]
+
+
 class Tracker:
     def __init__(self, options: TrackerOptions) -> None:
         self._options = options
+        self._queue: queue.Queue[_Record] = queue.Queue(maxsize=options.queue_size)
+        self._counter_lock = threading.Lock()
+        self._recorded = 0
+        self._written = 0
+        self._dropped = 0
+        self._closed = threading.Event()
+        self._writer = threading.Thread(target=self._drain, name="tracker-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
 
-    def record(self, game: GameModel, time_taken: float, request: flk.Request) -> None:
-        fd = _today_fd_getter.get_fd()
-        client_ip = request.headers.get("X-Forwarded-For", request.remote_addr)
-        fd.write(f"{client_ip}\t{datetime.datetime.now(datetime.timezone.utc).strftime('%d/%m/%Y %H:%M:%S')}\t"
-                 f"{game.target}\t{game.numbers}\t{game.game_options.to_dict()}\n")
-        fd.flush()
+    def record(self, game: GameModel, time_taken: float, client: str | None) -> None:
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            self._queue.put_nowait((client, timestamp, game))
+        except queue.Full:
+            with self._counter_lock:
+                self._dropped += 1
+            return
+        with self._counter_lock:
+            self._recorded += 1
 
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
 
-class _TodayFdGetter:
-    def __init__(self) -> None:
-        self._last_date = datetime.datetime.now(datetime.timezone.utc).date()
-        if not os.path.exists("logs"):
-            os.makedirs("logs")
-        self._fd = open(f"logs/{self._last_date.isoformat()}.log", "a")
+    @property
+    def dropped_count(self) -> int:
+        return self._dropped
 
-    def get_fd(self) -> _io.TextIOWrapper:
-        today = datetime.datetime.now(datetime.timezone.utc).date()
-        if today != self._last_date:
-            self._fd.close()
-            self._fd = open(f"logs/{today.isoformat()}.log", "a")
-            self._last_date = today
-        return self._fd
+    def stats(self) -> dict[str, int]:
+        with self._counter_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "recorded": self._recorded,
+                "written": self._written,
+                "dropped": self._dropped,
+            }
+
+    def close(self) -> None:
+        self._closed.set()
+        self._writer.join()
+
+    def _drain(self) -> None:
+        files = _DailyFiles(self._options.log_dir, self._options.log_format)
+        batch: list[_Record] = []
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self._options.flush_interval - (time.monotonic() - last_flush))
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+                while len(batch) < self._options.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            closing = self._closed.is_set() and self._queue.empty()
+            if (
+                    len(batch) >= self._options.batch_size
+                    or time.monotonic() - last_flush >= self._options.flush_interval
+                    or closing
+            ):
+                self._write(files, batch)
+                batch = []
+                last_flush = time.monotonic()
+            if closing:
+                files.close()
+                return
 
+    def _write(self, files: _DailyFiles, batch: list[_Record]) -> None:
+        if not batch:
+            return
+        written = 0
+        try:
+            for record in batch:
+                files.get_fd(record[1].date()).write(self._encode(record))
+                written += 1
+            files.flush()
+        except Exception:
+            # a bad record or a failing disk costs the rest of this batch, never the writer thread
+            _logger.exception("tracker dropped %d of %d records", len(batch) - written, len(batch))
+        with self._counter_lock:
+            self._written += written
+            self._dropped += len(batch) - written
 
-_today_fd_getter = _TodayFdGetter()
+    def _encode(self, record: _Record) -> str | bytes:
+        client_ip, timestamp, game = record
+        if self._options.log_format is LogFormat.BINARY:
+            return pack_record(timestamp.timestamp(), client_ip, game.target, game.numbers, game.game_options)
+        return (
+            f"{client_ip}\t{timestamp.strftime('%d/%m/%Y %H:%M:%S')}\t"
+            f"{game.target}\t{game.numbers}\t{game.game_options.to_dict()}\n"
+        )
 
+
+class _DailyFiles:
+    _EXTENSIONS = {
+        LogFormat.TEXT: ("log", "a"),
+        LogFormat.BINARY: ("bin", "ab"),
+    }
+
+    def __init__(self, log_dir: str, log_format: LogFormat) -> None:
+        self._log_dir = log_dir
+        self._extension, self._mode = self._EXTENSIONS[log_format]
+        self._date: datetime.date | None = None
+        self._fd: _io.TextIOWrapper | _io.BufferedWriter | None = None
+
+    def get_fd(self, date: datetime.date) -> _io.TextIOWrapper | _io.BufferedWriter:
+        if self._fd is None or date != self._date:
+            self.close()
+            os.makedirs(self._log_dir, exist_ok=True)
+            self._fd = open(os.path.join(self._log_dir, f"{date.isoformat()}.{self._extension}"), self._mode)
+            self._date = date
+        return self._fd
+
+    def flush(self) -> None:
+        if self._fd is not None:
+            self._fd.flush()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
@@ -1,26 +1,103 @@
+import hashlib
+import hmac
+import re
 from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, timezone
 from typing import Callable
 
-__all__ = ["get_encryptor_decryptor"]
+from .expression import Expression, is_postfix, postfix_to_string
 
+__all__ = ["decode_solution", "encode_solution", "get_encryptor_decryptor"]
 
-def get_encryptor_decryptor() -> tuple[Callable[[str], str], Callable[[str], str]]:
-    def encrypt(data: str) -> str:
-        return urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+# signed token: version byte, key id byte, postfix expression, truncated HMAC-SHA256 of everything before it
+_SIGNED_VERSION = 2
+_TAG_SIZE = 12
+
+# links from before signing held the expression text, e.g. "(10 - 4) * (5 - 1)"
+_LEGACY_TEXT = re.compile(r"\(*-?\d+\)*(?: [-+*/] \(*-?\d+\)*)*")
+
+
+def _b64encode(data: bytes) -> str:
+    return urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return urlsafe_b64decode((data + "=" * (-len(data) % 4)).encode("ascii"))
+
+
+def _key_id(key: bytes) -> int:
+    return hashlib.sha256(key).digest()[0]
+
+
+def get_encryptor_decryptor(
+        secret: str,
+        previous_secrets: tuple[str, ...] = (),
+        unsigned_until: date | None = None,
+) -> tuple[Callable[[Expression], str], Callable[[str], str]]:
+    key = secret.encode("utf-8")
+    header = bytes([_SIGNED_VERSION, _key_id(key)])
+    keyring: dict[int, list[bytes]] = {}
+    for known in (key, *(previous.encode("utf-8") for previous in previous_secrets)):
+        keyring.setdefault(_key_id(known), []).append(known)
+
+    def encrypt(solution: Expression) -> str:
+        message = header + solution.to_postfix()
+        return _b64encode(message + hmac.digest(key, message, "sha256")[:_TAG_SIZE])
 
     def decrypt(data: str) -> str:
-        return urlsafe_b64decode(data.encode("ascii")).decode("utf-8")
+        raw = _b64decode(data)
+        if raw[:1] != header[:1]:
+            if unsigned_until is None or datetime.now(timezone.utc).date() > unsigned_until:
+                raise ValueError("Unsigned solution link")
+            return decode_solution(data)
+        message, tag = raw[:-_TAG_SIZE], raw[-_TAG_SIZE:]
+        if len(message) < 3 or not any(
+                hmac.compare_digest(hmac.digest(known, message, "sha256")[:_TAG_SIZE], tag)
+                for known in keyring.get(message[1], ())
+        ):
+            raise ValueError("Invalid solution signature")
+        return postfix_to_string(message[2:])
 
     return encrypt, decrypt
 
 
+def encode_solution(solution: Expression) -> str:
+    return _b64encode(solution.to_postfix())
+
+
+def decode_solution(data: str) -> str:
+    raw = _b64decode(data)
+    if is_postfix(raw):
+        return postfix_to_string(raw)
+    text = raw.decode("utf-8")
+    if not _LEGACY_TEXT.fullmatch(text) or text.count("(") != text.count(")"):
+        raise ValueError("Not a solution")
+    return text
+
+
 if __name__ == "__main__":
-    key = "key"
+    from .expression import BiOpExpression, NumberExpression
 
-    encrypt, decrypt = get_encryptor_decryptor(key)
-    data = "Hello, World!"
+    encrypt, decrypt = get_encryptor_decryptor("key")
+    _, decrypt_rotated = get_encryptor_decryptor("new key", ("key",))
+    data = BiOpExpression.mul(NumberExpression(4), BiOpExpression.add(NumberExpression(3), NumberExpression(3)))
     encrypted = encrypt(data)
     decrypted = decrypt(encrypted)
+    assert decrypted == decrypt_rotated(encrypted) == data.to_string()
+    _, decrypt_legacy = get_encryptor_decryptor("key", unsigned_until=date.max)
+    assert decrypt_legacy(_b64encode(data.to_string().encode("utf-8"))) == data.to_string()
+    for forged_decrypt, forged in (
+            (decrypt, data.to_string()),
+            (decrypt_legacy, "<script>alert(1)</script>"),
+            (decrypt_legacy, "(1 + 2"),
+            (decrypt_legacy, ""),
+    ):
+        try:
+            forged_decrypt(_b64encode(forged.encode("utf-8")))
+        except ValueError:
+            continue
+        raise AssertionError(f"Accepted {forged!r}")
     print(f"Data: {data}")
     print(f"Encrypted: {encrypted}")
     print(f"Decrypted: {decrypted}")
@@ -2,6 +2,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
+from typing import Iterator
 
 from .types import number
 
@@ -11,6 +12,9 @@ __all__ = [
     "Expression",
     "BiOpExpression",
     "NumberExpression",
+    "is_postfix",
+    "parse_postfix",
+    "postfix_to_string",
 ]
 
 
@@ -21,20 +25,118 @@ class BinaryOperation(Enum):
     DIVISION = "/"
 
     def precedence(self) -> int:
-        return {
-            BinaryOperation.ADDITION: 1,
-            BinaryOperation.SUBTRACTION: 1,
-            BinaryOperation.MULTIPLICATION: 2,
-            BinaryOperation.DIVISION: 2,
-        }[self]
+        return _PRECEDENCE[self]
 
     def commutative(self) -> bool:
-        return {
-            BinaryOperation.ADDITION: True,
-            BinaryOperation.SUBTRACTION: False,
-            BinaryOperation.MULTIPLICATION: True,
-            BinaryOperation.DIVISION: False,
-        }[self]
+        return _COMMUTATIVE[self]
+
+
+_PRECEDENCE = {
+    BinaryOperation.ADDITION: 1,
+    BinaryOperation.SUBTRACTION: 1,
+    BinaryOperation.MULTIPLICATION: 2,
+    BinaryOperation.DIVISION: 2,
+}
+_COMMUTATIVE = {
+    BinaryOperation.ADDITION: True,
+    BinaryOperation.SUBTRACTION: False,
+    BinaryOperation.MULTIPLICATION: True,
+    BinaryOperation.DIVISION: False,
+}
+
+# postfix encoding: a version byte, then numbers below _ESCAPE as one byte, other integers as _ESCAPE followed by a
+# zigzag varint, and operations as _OPERATION_CODES
+_POSTFIX_VERSION = 1
+_POSTFIX_HEADER = bytes([_POSTFIX_VERSION])
+_ESCAPE = 0xFB
+_OPERATION_CODES = {operation: 0xFC + index for index, operation in enumerate(BinaryOperation)}
+_CODE_OPERATIONS = {code: operation for operation, code in _OPERATION_CODES.items()}
+
+
+def _write_number(value: number, out: bytearray) -> None:
+    if not isinstance(value, int):
+        raise ValueError(f"Only integers can be encoded, got {value!r}")
+    if 0 <= value < _ESCAPE:
+        out.append(value)
+        return
+    out.append(_ESCAPE)
+    zigzag = value * 2 if value >= 0 else -value * 2 - 1
+    while zigzag >= 0x80:
+        out.append(zigzag & 0x7F | 0x80)
+        zigzag >>= 7
+    out.append(zigzag)
+
+
+def _iter_postfix(data: bytes) -> Iterator[int | BinaryOperation]:
+    if not is_postfix(data):
+        raise ValueError("Not a postfix expression")
+    index = 1
+    while index < len(data):
+        byte = data[index]
+        index += 1
+        if byte < _ESCAPE:
+            yield byte
+        elif byte == _ESCAPE:
+            zigzag = shift = 0
+            while True:
+                if index >= len(data):
+                    raise ValueError("Truncated number in postfix expression")
+                byte = data[index]
+                index += 1
+                zigzag |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            yield zigzag // 2 if zigzag % 2 == 0 else -(zigzag + 1) // 2
+        else:
+            yield _CODE_OPERATIONS[byte]
+
+
+def _pop_operands(stack: list) -> tuple:
+    if len(stack) < 2:
+        raise ValueError("Operation without two operands in postfix expression")
+    right = stack.pop()
+    return stack.pop(), right
+
+
+def _single_result(stack: list) -> object:
+    if len(stack) != 1:
+        raise ValueError(f"Postfix expression leaves {len(stack)} values")
+    return stack[0]
+
+
+def is_postfix(data: bytes) -> bool:
+    return data[:1] == _POSTFIX_HEADER
+
+
+def parse_postfix(data: bytes) -> Expression:
+    stack: list[Expression] = []
+    for token in _iter_postfix(data):
+        if isinstance(token, BinaryOperation):
+            stack.append(BiOpExpression(token, *_pop_operands(stack)))
+        else:
+            stack.append(NumberExpression(token))
+    return _single_result(stack)
+
+
+def postfix_to_string(data: bytes) -> str:
+    stack: list[tuple[str, BinaryOperation | None]] = []
+    for token in _iter_postfix(data):
+        if not isinstance(token, BinaryOperation):
+            stack.append((str(token), None))
+            continue
+        (left, left_op), (right, right_op) = _pop_operands(stack)
+        precedence = _PRECEDENCE[token]
+        if left_op is not None and _PRECEDENCE[left_op] < precedence:
+            left = f"({left})"
+        if right_op is not None and (
+                _PRECEDENCE[right_op] < precedence
+                or (_PRECEDENCE[right_op] == precedence and not _COMMUTATIVE[token])
+        ):
+            right = f"({right})"
+        stack.append((f"{left} {token.value} {right}", token))
+    text, _ = _single_result(stack)
+    return text
 
 
 class _ElementLocation(Enum):
@@ -51,6 +153,15 @@ class Expression(ABC):
     ) -> str:
         pass
 
+    @abstractmethod
+    def write_postfix(self, out: bytearray) -> None:
+        pass
+
+    def to_postfix(self) -> bytes:
+        out = bytearray(_POSTFIX_HEADER)
+        self.write_postfix(out)
+        return bytes(out)
+
     def __str__(self) -> str:
         return self.to_string()
 
@@ -72,13 +183,13 @@ class BiOpExpression(Expression):
         if parent_expression is None:
             return f"{left} {op} {right}"
         assert isinstance(parent_expression, BiOpExpression)
-        this_precedence = self.binary_operation.precedence()
-        parent_precedence = parent_expression.binary_operation.precedence()
+        this_precedence = _PRECEDENCE[self.binary_operation]
+        parent_precedence = _PRECEDENCE[parent_expression.binary_operation]
         should_add_brackets = (
             this_precedence < parent_precedence
             or (
                 this_precedence == parent_precedence
-                and not parent_expression.binary_operation.commutative()
+                and not _COMMUTATIVE[parent_expression.binary_operation]
                 and location is _ElementLocation.BIOP_RIGHT
             )
         )
@@ -86,6 +197,11 @@ class BiOpExpression(Expression):
             return f"({left} {op} {right})"
         return f"{left} {op} {right}"
 
+    def write_postfix(self, out: bytearray) -> None:
+        self.left.write_postfix(out)
+        self.right.write_postfix(out)
+        out.append(_OPERATION_CODES[self.binary_operation])
+
     @classmethod
     def add(cls, a: Expression, b: Expression) -> BiOpExpression:
         return cls(BinaryOperation.ADDITION, a, b)
@@ -114,6 +230,9 @@ class NumberExpression(Expression):
     ) -> str:
         return str(self.value)
 
+    def write_postfix(self, out: bytearray) -> None:
+        _write_number(self.value, out)
+
 
 if __name__ == "__main__":
     a = NumberExpression(1)
@@ -126,3 +245,6 @@ if __name__ == "__main__":
     print(BiOpExpression.add(a, BiOpExpression.mul(b, c)).to_string())
     print(BiOpExpression.div(a, BiOpExpression.mul(b, c)).to_string())
     print(BiOpExpression.mul(BiOpExpression.add(a, b), c).to_string())
+    expression = BiOpExpression.div(BiOpExpression.sub(a, NumberExpression(-300)), BiOpExpression.mul(b, c))
+    assert parse_postfix(expression.to_postfix()) == expression
+    assert postfix_to_string(expression.to_postfix()) == expression.to_string()
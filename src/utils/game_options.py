@@ -1,8 +1,15 @@
 from dataclasses import asdict, dataclass, replace
-from typing import Self
+from enum import Enum
+from typing import Any, Self
 
 
-__all__ = ["GameOptions"]
+__all__ = ["Difficulty", "GameOptions"]
+
+
+class Difficulty(Enum):
+    EASY = "easy"
+    MEDIUM = "medium"
+    HARD = "hard"
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -10,6 +17,7 @@ class GameOptions:
     allow_integer: bool = True
     allow_float_only: bool = False
     must_use_all: bool = True
+    difficulty: Difficulty | None = None
 
     def integer_solvable(self) -> bool:
         return self.allow_integer and not self.allow_float_only
@@ -23,8 +31,11 @@ class GameOptions:
     def solvable(self) -> bool:
         return self.allow_integer or self.allow_float_only
 
-    def to_dict(self) -> dict[str, bool]:
-        return asdict(self)
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "difficulty": self.difficulty.value if self.difficulty is not None else None,
+        }
 
     def is_valid(self) -> tuple[bool, str]:
         if not (self.allow_integer or self.allow_float_only):
@@ -34,6 +45,12 @@ class GameOptions:
     def as_integer_solvable(self) -> Self:
         return replace(self, allow_integer=True, allow_float_only=False)
 
+    def as_float_only(self) -> Self:
+        return replace(self, allow_integer=False, allow_float_only=True)
+
+    def with_difficulty(self, difficulty: Difficulty | None) -> Self:
+        return replace(self, difficulty=difficulty)
+
     @classmethod
     def from_integer_solvable(cls) -> Self:
         return cls(allow_integer=True, allow_float_only=False)
@@ -54,4 +71,5 @@ class GameOptions:
             allow_integer=data.get("allow_integer", default_options.allow_integer),
             allow_float_only=data.get("allow_float_only", default_options.allow_float_only),
             must_use_all=data.get("must_use_all", default_options.must_use_all),
+            difficulty=default_options.difficulty,
         )
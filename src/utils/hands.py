@@ -0,0 +1,25 @@
+from collections import Counter
+from itertools import combinations_with_replacement
+from math import factorial
+
+
+__all__ = ["MAX_NUMBER", "MIN_NUMBER", "all_hands", "canonical_hand", "permutation_count"]
+
+
+MIN_NUMBER = 1
+MAX_NUMBER = 10
+
+
+def all_hands(quantity: int, low: int = MIN_NUMBER, high: int = MAX_NUMBER) -> list[tuple[int, ...]]:
+    return list(combinations_with_replacement(range(low, high + 1), quantity))
+
+
+def canonical_hand(numbers: list[int] | tuple[int, ...]) -> tuple[int, ...]:
+    return tuple(sorted(numbers))
+
+
+def permutation_count(hand: tuple[int, ...]) -> int:
+    count = factorial(len(hand))
+    for repeat in Counter(hand).values():
+        count //= factorial(repeat)
+    return count
@@ -1,4 +1,6 @@
-__all__ = ["parse_int"]
+from typing import Any
+
+__all__ = ["parse_int", "parse_json_bool_dict", "parse_json_int"]
 
 
 def parse_int(number_str: str | int) -> int | None:
@@ -21,3 +23,14 @@ def parse_to_bool_dict(data: dict[str, str | bool], default_val: bool = False) -
         key: b if (b := parse_bool(value)) is not None else default_val
         for key, value in data.items()
     }
+
+def parse_json_int(value: Any) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+def parse_json_bool_dict(data: dict[str, Any]) -> dict[str, bool]:
+    for key, value in data.items():
+        if not isinstance(value, bool):
+            raise ValueError(f"{key} must be true or false")
+    return dict(data)